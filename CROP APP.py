@@ -4,17 +4,27 @@
 # In[1]:
 
 
+import io
+import os
+import tempfile
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 import seaborn as sns
+import matplotlib
+matplotlib.use('Agg')  # Headless backend: Streamlit never needs Tk/Qt init
 import matplotlib.pyplot as plt
+import plotly.express as px
 
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder, StandardScaler
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
 from sklearn.metrics import classification_report, accuracy_score
 
+# Apply the seaborn theme once at import instead of re-setting rcParams
+# partway through the Visualization page on every rerun
+sns.set_theme(style='whitegrid', palette='Set2')
+
 # Set up Streamlit layout to use full screen width
 st.set_page_config(layout="wide")
 
@@ -41,10 +51,664 @@ for key in ['df', 'cleaned_df', 'target', 'model_type', 'model', 'report']:
         st.session_state[key] = None
 
 # Define the required columns expected in the uploaded dataset
-expected_columns = ["Area", "Item", "Year", "hg/ha_yield", 
-                    "average_rain_fall_mm_per_year", "pesticides_tonnes", 
+expected_columns = ["Area", "Item", "Year", "hg/ha_yield",
+                    "average_rain_fall_mm_per_year", "pesticides_tonnes",
                     "avg_temp"]
 
+# Blank template CSV built once at import time instead of on every rerun
+template_csv = pd.DataFrame(columns=expected_columns).to_csv(index=False)
+
+
+# Explicit narrow dtypes for the known schema: float32/int16 instead of
+# inferred float64/int64 and categorical strings instead of Python objects
+# cut the in-memory frame to roughly a quarter of the default size
+csv_dtypes = {"Year": np.int16,
+              "hg/ha_yield": np.float32,
+              "average_rain_fall_mm_per_year": np.float32,
+              "pesticides_tonnes": np.float32,
+              "avg_temp": np.float32,
+              "Area": "category",
+              "Item": "category"}
+
+
+# Cached loaders: Streamlit reruns the whole script on every widget
+# interaction, so parse the file once and serve reruns from memory.
+# CSV parsing goes through pyarrow's multithreaded reader and only pulls
+# the expected columns; files that don't match the schema fall back to a
+# plain parse so the column checks below can report what is wrong.
+@st.cache_data
+def load_csv(file_bytes):
+    try:
+        return pd.read_csv(io.BytesIO(file_bytes), usecols=expected_columns,
+                           dtype=csv_dtypes, engine='pyarrow')
+    except (ValueError, TypeError):
+        return pd.read_csv(io.BytesIO(file_bytes))
+
+@st.cache_data
+def load_excel(file_bytes):
+    return pd.read_excel(io.BytesIO(file_bytes))
+
+@st.cache_data
+def load_default_dataset(path):
+    return pd.read_csv(path, usecols=expected_columns,
+                       dtype=csv_dtypes, engine='pyarrow')
+
+# The cleaned frame is persisted to Parquet and read back through the
+# shared cache: every session then references one in-memory copy keyed
+# by the file's mtime instead of each session holding its own, and a
+# restarted app warm-starts from disk instead of recleaning
+cleaned_parquet_path = os.path.join(tempfile.gettempdir(), "crop_app_cleaned.parquet")
+
+@st.cache_data
+def load_cleaned(path, mtime):
+    return pd.read_parquet(path, engine='pyarrow')
+
+# Cached profiling: describe/isna/duplicated are recomputed only when the
+# underlying dataframe actually changes, not on every interaction
+@st.cache_data
+def compute_summary(df):
+    dtypes_df = pd.DataFrame(df.dtypes, columns=["Data Type"])
+    # Describe numeric and non-numeric columns separately so the costly
+    # quantile passes only touch the numeric block, then join the halves
+    # instead of letting describe build one wide object-dtype result
+    pieces = []
+    numeric = df.select_dtypes(include='number')
+    if not numeric.columns.empty:
+        pieces.append(numeric.describe())
+    non_numeric = df.select_dtypes(exclude='number')
+    if not non_numeric.columns.empty:
+        pieces.append(non_numeric.describe())
+    describe_df = pd.concat(pieces, axis=1).reindex(columns=df.columns)
+    missing_counts = df.isna().sum()
+    dup_count, _ = dup_report(df)
+    return dtypes_df, describe_df, missing_counts, dup_count
+
+# Duplicate detection from a single row-hash pass: the same hashes give
+# both the duplicate count and the keep-mask the removal step applies,
+# instead of hashing every row once to count and again to drop
+@st.cache_data
+def dup_report(df):
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    _, first_idx = np.unique(hashes, return_index=True)
+    keep = np.zeros(len(df), dtype=bool)
+    keep[first_idx] = True
+    return int(len(df) - keep.sum()), keep
+
+# Cached aggregates for the Visualization step: every widget interaction
+# reruns the whole script, so each groupby/value_counts result is computed
+# once per dataset and served from cache on subsequent reruns
+@st.cache_data
+def agg_mean(df, by, col):
+    # Project down to the key and value columns before grouping so the
+    # hash aggregation only moves the bytes it actually reduces
+    cols = [col] if isinstance(col, str) else list(col)
+    return df[[by] + cols].groupby(by)[col].mean()
+
+@st.cache_data
+def agg_sum(df, by, col):
+    cols = [col] if isinstance(col, str) else list(col)
+    return df[[by] + cols].groupby(by)[col].sum()
+
+# Cached correlation matrix for the Preprocessing step: corr() is
+# O(cols^2 x rows) and would otherwise rerun on every widget interaction.
+# After encoding the frame is all-numeric with no NaNs, so np.corrcoef on
+# one contiguous float32 buffer takes the BLAS matrix path instead of
+# pandas' pairwise NaN-aware loop.
+@st.cache_data
+def corr_matrix(df):
+    arr = df.to_numpy(dtype=np.float32)
+    # np.corrcoef propagates NaN, so the BLAS path is only valid on a
+    # fully populated frame; with NaNs present (all cleaning options are
+    # optional) fall back to pandas' pairwise-complete correlations
+    if np.isnan(arr).any():
+        return df.corr()
+    corr = np.corrcoef(arr, rowvar=False)
+    return pd.DataFrame(corr, index=df.columns, columns=df.columns)
+
+# Optional numba acceleration for the correlation-pair scan: on wide
+# matrices the JIT-compiled triangle walk finds flagged pairs in one pass
+# without materializing the |corr| temporary the NumPy mask needs.
+# numba stays optional — without it the scan below falls back to the
+# vectorized upper-triangle mask.
+try:
+    from numba import njit
+
+    @njit(cache=True)
+    def _high_corr_pairs(arr, threshold):
+        idx_i = []
+        idx_j = []
+        n = arr.shape[0]
+        for i in range(n):
+            for j in range(i + 1, n):
+                v = arr[i, j]
+                if v >= threshold or -v >= threshold:
+                    idx_i.append(i)
+                    idx_j.append(j)
+        return idx_i, idx_j
+except ImportError:
+    _high_corr_pairs = None
+
+
+# Correlation heatmap via imshow: one rasterized pass colors the whole
+# matrix, and Text artists are only created for cells worth reading
+# (|r| > 0.1) instead of seaborn's per-cell annotation and facecolor work
+@st.cache_resource
+def fig_corr_heatmap(corr):
+    fig, ax = plt.subplots(figsize=(8, 8))
+    arr = corr.to_numpy()
+    im = ax.imshow(arr, cmap='coolwarm', vmin=-1, vmax=1)
+    ax.set_xticks(range(len(corr.columns)))
+    ax.set_xticklabels(corr.columns, rotation=45, ha='right')
+    ax.set_yticks(range(len(corr.columns)))
+    ax.set_yticklabels(corr.columns)
+    for i, j in zip(*np.where(np.abs(arr) > 0.1)):
+        ax.text(j, i, f'{arr[i, j]:.2f}', ha='center', va='center', fontsize=9)
+    fig.colorbar(im, ax=ax, shrink=0.8)
+    ax.set_title('Heatmap of Correlation Matrix', fontsize=18)
+    plt.close(fig)
+    return fig
+
+# Cached row indices per group value: selecting a crop/country then costs
+# one take over that group's rows instead of re-running a full-length
+# equality scan and boolean gather on every selectbox change
+@st.cache_data
+def group_indices(df, col):
+    return {k: v.astype(np.int64) for k, v in df.groupby(col, sort=False).indices.items()}
+
+@st.cache_data
+def agg_value_counts(df, col):
+    s = df[col]
+    # For categorical columns, count the integer codes directly with
+    # bincount — one C-level pass over contiguous codes instead of hashing
+    # every string — then order descending like value_counts would
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        codes = s.cat.codes.to_numpy()
+        counts = np.bincount(codes[codes >= 0], minlength=len(s.cat.categories))
+        order = np.argsort(-counts, kind='stable')
+        return pd.Series(counts[order], index=s.cat.categories[order], name='count')
+    return s.value_counts()
+
+# Shared tick styling helper used by the cached figure builders below:
+# one tick_params call on the axis instead of a Python loop over labels
+def style_axis_ticks(ax, axis='x', rotation=None, fontsize=12):
+    if rotation is not None:
+        ax.tick_params(axis=axis, labelrotation=rotation, labelsize=fontsize)
+    else:
+        ax.tick_params(axis=axis, labelsize=fontsize)
+
+# Cached figure builders for the Visualization step: constructing the
+# seaborn/matplotlib figures dominates rerun time, so each Figure is built
+# once per dataset and served from the resource cache afterwards. Figures
+# are closed right away so they do not pile up in pyplot's registry;
+# st.pyplot renders a closed figure without issue.
+@st.cache_resource
+def fig_crop_pie(crops):
+    fig, ax = plt.subplots(figsize=(10, 10))
+    # Slightly explode each slice for visual seperation
+    explode = [0.05] * len(crops)
+    # Plot the pie chart
+    ax.pie(crops, labels=crops.index,
+           autopct='%1.1f%%',
+           startangle=140,
+           explode=explode,
+           textprops={'fontsize': 20})
+    ax.set_title('Crop Distribution (Pie)', fontsize=20)
+    plt.close(fig)
+    return fig
+
+@st.cache_resource
+def fig_crop_bar(crop_df):
+    fig, ax = plt.subplots(figsize=(8, 8))
+    sns.barplot(
+        x='Crop',
+        y='Frequency',
+        data=crop_df,
+        palette='Spectral',
+        hue='Crop')
+    # Style the plot
+    style_axis_ticks(ax, axis='x', rotation=80, fontsize=14)
+    style_axis_ticks(ax, axis='y', fontsize=14)
+    ax.set_xlabel('Crop', fontsize=16)
+    ax.set_ylabel('Frequency', fontsize=16)
+    ax.set_title('Crop Frequency Bar Chart', fontsize=17)
+    plt.tight_layout()
+    plt.close(fig)
+    return fig
+
+@st.cache_resource
+def fig_area_count(df):
+    # Set figure size: wide vertically for long lists of areas
+    fig, ax = plt.subplots(figsize=(7, 13))
+    # Create a countplot showing the number of occurrences for each 'Area'
+    sns.countplot(data=df, y='Area', palette='husl', hue='Area')
+    # Adjust y-axis tick font size for better readability
+    style_axis_ticks(ax, axis='y', fontsize=8)
+    ax.set_xlabel('Frequency', fontsize=12)
+    ax.set_ylabel('Area', fontsize=12)
+    ax.set_title('Distribution of Records by Area', fontsize=14)
+    plt.tight_layout()
+    plt.close(fig)
+    return fig
+
+@st.cache_resource
+def fig_top_areas(top_areas):
+    fig, ax = plt.subplots(figsize=(8, 8))
+    sns.barplot(x=top_areas.index, y=top_areas.values, palette='coolwarm', hue=top_areas.index)
+    ax.set_xticklabels(ax.get_xticklabels(), rotation=80, fontsize=12)
+    ax.set_xlabel('Area', fontsize=14)
+    ax.set_ylabel('Frequency', fontsize=14)
+    ax.set_title('Top 20 Areas', fontsize=15)
+    plt.tight_layout()
+    plt.close(fig)
+    return fig
+
+@st.cache_resource
+def fig_least_areas(least_areas):
+    fig, ax = plt.subplots(figsize=(8, 8))
+    sns.barplot(x=least_areas.index, y=least_areas.values, palette='viridis', hue=least_areas.index)
+    ax.set_xticklabels(ax.get_xticklabels(), rotation=80, fontsize=12)
+    ax.set_xlabel('Area', fontsize=14)
+    ax.set_ylabel('Frequency', fontsize=14)
+    ax.set_title('Least 20 Areas', fontsize=14)
+    plt.tight_layout()
+    plt.close(fig)
+    return fig
+
+@st.cache_resource
+def fig_yearly_yield(yearly_yield):
+    fig, ax = plt.subplots(figsize=(8, 5))
+    yearly_yield.plot(ax=ax, color='orange', linewidth=2, marker='o')
+    ax.set_title('Average Crop Yield per Year (hg/ha)', fontsize=16)
+    ax.set_xlabel('Year', fontsize=14)
+    ax.set_ylabel('Average Yield (hg/ha)', fontsize=14)
+    ax.set_xticklabels(ax.get_xticklabels(), fontsize=12)
+    ax.set_yticklabels(ax.get_yticklabels(), fontsize=12)
+    # Add grid for better visual guidance
+    ax.grid(True, linestyle='--', alpha=0.6)
+    plt.tight_layout()
+    plt.close(fig)
+    return fig
+
+@st.cache_resource
+def fig_best_crop(best_crop):
+    fig, ax = plt.subplots(figsize=(8, 8))
+    sns.barplot(data=best_crop, x='Area', y='Hg/ha_yield', hue='Crop')
+    ax.set_title('Maximum Yield per Crop by Area (hg/ha)', fontsize=16)
+    ax.set_xlabel('Area', fontsize=14)
+    ax.set_ylabel('Maximum Yield (hg/ha)', fontsize=14)
+    ax.set_xticklabels(ax.get_xticklabels(), fontsize=12, rotation=45)
+    ax.set_yticklabels(ax.get_yticklabels(), fontsize=12)
+    # Resize and position the hue legend
+    ax.legend(title='Crop', title_fontsize=12, fontsize=10, loc='upper right', bbox_to_anchor=(1.15, 1))
+    plt.tight_layout()
+    plt.close(fig)
+    return fig
+
+@st.cache_resource
+def fig_yield_per_crop(yield_per_crop):
+    fig, ax = plt.subplots(figsize=(10, 6))
+    sns.barplot(x=yield_per_crop.values, y=yield_per_crop.index, color='orange', ax=ax)
+    ax.set_title('Total Crop Yield (hg/ha)', fontsize=16)
+    ax.set_xlabel('Yield (hg/ha)', fontsize=14)
+    ax.set_ylabel('Crop', fontsize=14)
+    plt.tight_layout()
+    plt.close(fig)
+    return fig
+
+@st.cache_resource
+def fig_area_avg(area_avg):
+    fig, ax = plt.subplots(figsize=(7, 13))
+    sns.barplot(data=area_avg, x='Hg/ha_yield', y='Area', hue='Area', palette="viridis")
+    ax.set_yticklabels(ax.get_yticklabels(), fontsize=9)
+    ax.set_xlabel('Average Yield (hg/ha)', fontsize=12)
+    ax.set_ylabel('Area', fontsize=12)
+    ax.set_title('Average Crop Yield by Area', fontsize=14)
+    plt.tight_layout()
+    plt.close(fig)
+    return fig
+
+@st.cache_resource
+def fig_rainfall_year(rainfall_year):
+    fig, ax = plt.subplots(figsize=(8, 5))
+    rainfall_year.plot(color='red', linewidth=2, marker='o')
+    ax.set_title('Average Rainfall per Year', fontsize=16)
+    ax.set_xlabel('Year', fontsize=14)
+    ax.set_ylabel('Average Rainfall (mm)', fontsize=14)
+    ax.set_xticklabels(ax.get_xticklabels(), fontsize=12)
+    ax.set_yticklabels(ax.get_yticklabels(), fontsize=12)
+    ax.grid(True, linestyle='--', alpha=0.6)
+    plt.tight_layout()
+    plt.close(fig)
+    return fig
+
+@st.cache_resource
+def fig_top10_rainfall(top10_df):
+    fig, ax = plt.subplots(figsize=(9, 7))
+    sns.barplot(data=top10_df, x='Average_Rainfall', y='Area',
+                palette='dark:orange', hue='Area')
+    ax.set_title('Top 10 Countries by Average Rainfall', fontsize=18)
+    ax.set_xlabel('Average Rainfall (mm/year)', fontsize=15)
+    ax.set_ylabel('Country/Area', fontsize=15)
+    ax.set_xticklabels(ax.get_xticklabels(), fontsize=14)
+    ax.set_yticklabels(ax.get_yticklabels(), fontsize=14)
+    plt.tight_layout()
+    plt.close(fig)
+    return fig
+
+@st.cache_resource
+def fig_rain_vs_yield(df):
+    fig, ax = plt.subplots(figsize=(10, 6))
+    # Aggregate the points into hexagonal bins instead of drawing one
+    # artist per row: the dense scatter suffered heavy overdraw and its
+    # per-point rendering dominated the chart's build time
+    hb = ax.hexbin(df['Average_rain_fall_mm_per_year'], df['Hg/ha_yield'],
+                   gridsize=60, cmap='viridis', mincnt=1)
+    fig.colorbar(hb, ax=ax, label='Records')
+    ax.set_title('Effect of Rainfall on Crop Yield', fontsize=16)
+    ax.set_xlabel('Average Rainfall (mm/year)', fontsize=14)
+    ax.set_ylabel('Yield (hg/ha)', fontsize=14)
+    style_axis_ticks(ax, axis='x', fontsize=14)
+    style_axis_ticks(ax, axis='y', fontsize=14)
+    plt.close(fig)
+    return fig
+
+# The two selection-keyed builders cap their cache: browsing the crop and
+# country selectboxes would otherwise pin one Figure per choice forever
+@st.cache_resource(max_entries=64)
+def fig_crop_metric(crop_yearly, selected_crop, label, color):
+    fig, ax = plt.subplots(figsize=(10, 6))
+    # Plot mean values grouped by year
+    crop_yearly.plot(ax=ax, color=color, marker='o')
+    # Add plot formatting
+    ax.set_title(f"{label} over Years for {selected_crop}", fontsize=16)
+    ax.set_xlabel("Year", fontsize=14)
+    ax.set_ylabel(label, fontsize=14)
+    style_axis_ticks(ax, axis='x', fontsize=14)
+    style_axis_ticks(ax, axis='y', fontsize=14)
+    ax.legend()
+    ax.grid(True)
+    plt.tight_layout()
+    plt.close(fig)
+    return fig
+
+@st.cache_resource(max_entries=64)
+def fig_country_trend(filtered, selected_country):
+    fig, ax = plt.subplots()
+    sns.lineplot(data=filtered, x='Year', y='Hg/ha_yield', hue='Crop', marker='o', ax=ax)
+    ax.set_title(f"Crop Yield Over Time in {selected_country}", fontsize=16)
+    ax.set_xlabel("Year", fontsize=14)
+    ax.set_ylabel("Yield (hg/ha)", fontsize=14)
+    style_axis_ticks(ax, axis='x', fontsize=14)
+    style_axis_ticks(ax, axis='y', fontsize=14)
+    plt.close(fig)
+    return fig
+
+@st.cache_resource
+def fig_top_pesticide(top_pesticide):
+    fig, ax = plt.subplots()
+    sns.barplot(x=top_pesticide.values, y=top_pesticide.index,
+                palette="Reds_r", ax=ax, hue=top_pesticide.index)
+    ax.set_title("Top 10 Countries by Pesticide Use", fontsize=16)
+    ax.set_xlabel("Total Pesticides Used (tonnes)", fontsize=14)
+    ax.set_ylabel("Country", fontsize=14)
+    style_axis_ticks(ax, axis='x', fontsize=14)
+    style_axis_ticks(ax, axis='y', fontsize=14)
+    plt.close(fig)
+    return fig
+
+@st.cache_resource
+def fig_pesticide_trend(pesticide_trend):
+    fig, ax = plt.subplots()
+    sns.lineplot(x=pesticide_trend.index, y=pesticide_trend.values, marker='o', ax=ax)
+    ax.set_title("Pesticide Use Over Time", fontsize=16)
+    ax.set_xlabel("Year", fontsize=14)
+    ax.set_ylabel("Global Pesticide Use Over Time", fontsize=14)
+    style_axis_ticks(ax, axis='x', fontsize=14)
+    style_axis_ticks(ax, axis='y', fontsize=14)
+    plt.close(fig)
+    return fig
+
+@st.cache_resource
+def fig_crop_pesticide(crop_pesticide):
+    fig, ax = plt.subplots()
+    sns.barplot(x=crop_pesticide.values, y=crop_pesticide.index, palette="YlOrBr",
+                ax=ax, hue=crop_pesticide.index)
+    ax.set_title("Top 10 Crops by Pesticide Use", fontsize=16)
+    ax.set_xlabel('Total Pesticides Used (tonnes)', fontsize=14)
+    ax.set_ylabel('Crop', fontsize=14)
+    plt.tight_layout()
+    style_axis_ticks(ax, axis='x', fontsize=14)
+    style_axis_ticks(ax, axis='y', fontsize=14)
+    plt.close(fig)
+    return fig
+
+# WebGL scatters for the full dataset: Plotly ships the points to the
+# browser and renders them on the GPU, instead of rasterizing thousands
+# of artists into a server-side PNG on every rerun
+@st.cache_resource
+def fig_pesticide_vs_yield(df):
+    fig = px.scatter(df, x='Pesticides_tonnes', y='Hg/ha_yield', color='Crop',
+                     render_mode='webgl', title='Pesticide vs Crop Yield',
+                     labels={'Pesticides_tonnes': 'Pesticides (tonnes)',
+                             'Hg/ha_yield': 'Yield (hg/ha)'})
+    return fig
+
+@st.cache_resource
+def fig_temp_vs_yield(df):
+    fig = px.scatter(df, x='Avg_temp', y='Hg/ha_yield', color='Crop',
+                     render_mode='webgl', title='Temperature vs Yield',
+                     labels={'Avg_temp': 'Temperature (°C)',
+                             'Hg/ha_yield': 'Yield (hg/ha)'})
+    return fig
+
+@st.cache_resource
+def fig_avg_temp_year(avg_temp_year):
+    fig, ax = plt.subplots()
+    sns.lineplot(x=avg_temp_year.index, y=avg_temp_year.values, marker='o', ax=ax)
+    ax.set_title("Avg. Temperature Over Years", fontsize=16)
+    ax.set_xlabel("Year", fontsize=14)
+    ax.set_ylabel("Temperature (°C)", fontsize=14)
+    style_axis_ticks(ax, axis='x', fontsize=14)
+    style_axis_ticks(ax, axis='y', fontsize=14)
+    plt.close(fig)
+    return fig
+
+@st.cache_resource
+def fig_avg_rain_year(avg_rain_year):
+    fig, ax = plt.subplots()
+    sns.lineplot(x=avg_rain_year.index, y=avg_rain_year.values, marker='o', ax=ax)
+    ax.set_title("Avg. Rainfall Over Years", fontsize=16)
+    ax.set_xlabel("Year", fontsize=14)
+    ax.set_ylabel("Rainfall (mm)", fontsize=14)
+    style_axis_ticks(ax, axis='x', fontsize=14)
+    style_axis_ticks(ax, axis='y', fontsize=14)
+    plt.close(fig)
+    return fig
+
+@st.cache_resource
+def fig_country_pesticide_yield(avg_data_country):
+    fig, ax = plt.subplots()
+    sns.scatterplot(data=avg_data_country, x='Pesticides_tonnes', y='Hg/ha_yield')
+    ax.set_title('Average Pesticide Use vs Crop Yield by Country')
+    ax.set_xlabel('Average Pesticide Use (tonnes)')
+    ax.set_ylabel('Average Yield (hg/ha)')
+    plt.close(fig)
+    return fig
+
+@st.cache_resource
+def fig_avg_temp_country(avg_temp_country):
+    fig, ax = plt.subplots()
+    sns.barplot(x=avg_temp_country.values, y=avg_temp_country.index, palette="coolwarm", hue=avg_temp_country.index)
+    ax.set_title('Top 10 Countries by Average Temperature')
+    ax.set_xlabel('Average Temperature (°C)')
+    ax.set_ylabel('Country')
+    plt.close(fig)
+    return fig
+
+@st.cache_resource
+def fig_rain_vs_pesticide(df):
+    fig = px.scatter(df, x='Average_rain_fall_mm_per_year', y='Pesticides_tonnes',
+                     color='Crop', opacity=0.7, render_mode='webgl',
+                     title='Rainfall vs Pesticide Use by Crop',
+                     labels={'Average_rain_fall_mm_per_year': 'Average Rainfall (mm/year)',
+                             'Pesticides_tonnes': 'Pesticide Use (tonnes)'})
+    return fig
+
+@st.cache_resource
+def fig_distributions(df):
+    # constrained_layout spaces the grid during the single draw pass
+    # (no tight_layout sweep), and fixed bin counts skip the per-column
+    # data scan of automatic bin estimation
+    fig, axes = plt.subplots(2, 2, figsize=(16, 10), constrained_layout=True)
+    sns.histplot(df['Average_rain_fall_mm_per_year'], kde=True, bins=40, ax=axes[0, 0], color='blue')
+    axes[0, 0].set_title('Average Rainfall Distribution')
+    sns.histplot(df['Pesticides_tonnes'], kde=True, bins=40, ax=axes[0, 1], color='green')
+    axes[0, 1].set_title('Pesticide Usage Distribution')
+    sns.histplot(df['Avg_temp'], kde=True, bins=40, ax=axes[1, 0], color='orange')
+    axes[1, 0].set_title('Average Temperature Distribution')
+    sns.histplot(df['Hg/ha_yield'], kde=True, bins=40, ax=axes[1, 1], color='purple')
+    axes[1, 1].set_title('Crop Yield Distribution')
+    plt.close(fig)
+    return fig
+
+@st.cache_resource
+def fig_temp_by_crop(df):
+    fig, ax = plt.subplots(figsize=(12, 6))
+    sns.boxplot(data=df, x='Crop', y='Avg_temp', palette='coolwarm', hue='Crop')
+    ax.set_title('Temperature Distribution for Each Crop')
+    ax.set_xlabel('Crop')
+    ax.set_ylabel('Average Temperature (°C)')
+    style_axis_ticks(ax, axis='x', fontsize=14)
+    style_axis_ticks(ax, axis='y', fontsize=14)
+    plt.close(fig)
+    return fig
+
+@st.cache_resource
+def fig_yearly_yield_by_crop(df):
+    fig, ax = plt.subplots(figsize=(14, 7))
+    sns.lineplot(data=df, x='Year', y='Hg/ha_yield', hue='Crop', estimator='mean', errorbar=None)
+    ax.set_title('Average Crop Yield per Year')
+    ax.set_xlabel('Year')
+    ax.set_ylabel('Yield (hg/ha)')
+    ax.legend(title='Crop', bbox_to_anchor=(1.05, 1), loc='upper left')
+    plt.close(fig)
+    return fig
+
+
+# Probe a column for numeric content with a single coerced conversion
+# instead of a try/except round trip; returns the converted Series so the
+# result can be reused, or None if any non-null value failed to convert
+def try_numeric(series):
+    converted = pd.to_numeric(series, errors='coerce')
+    if converted.notna().sum() == series.notna().sum():
+        return converted
+    return None
+
+# Cached cleaning pipeline, keyed by the dataframe's content and the chosen
+# options: clicking Clean Data again with the same inputs (or re-uploading
+# the same file) reuses the previous result instead of redoing every step
+@st.cache_data
+def clean_data(df, selected_options):
+    cleaned_df = df.copy()  # Work on a copy of the dataset
+
+    if "Fixing Column Types" in selected_options:
+        # Fix incompatible column types before using st.dataframe()
+        for col in cleaned_df.columns:
+            if cleaned_df[col].dtype == 'object':
+                # Reuse the coerced result if values are numeric-like
+                converted = try_numeric(cleaned_df[col])
+                if converted is not None:
+                    cleaned_df[col] = converted
+                else:
+                    cleaned_df[col] = cleaned_df[col].astype(str)
+
+    # Change Items to Crop
+    if "Rename 'Items' to 'Crop'" in selected_options:
+        cleaned_df.rename(columns={'Item':'Crop'}, inplace=True)
+
+    # Remove duplicates, reusing the keep-mask from the shared hash pass
+    if "Remove duplicate rows" in selected_options:
+        _, keep = dup_report(cleaned_df)
+        cleaned_df = cleaned_df.iloc[keep]
+
+    # Fill missing numeric values with column mean
+    if "Fill missing values (numeric)" in selected_options:
+        numeric_cols = cleaned_df.select_dtypes(include='number').columns
+        # Fill directly on a NumPy buffer: one nanmean pass plus a single
+        # vectorized assignment, instead of SimpleImputer's validation and
+        # the extra DataFrame-to-array-to-DataFrame round trip
+        arr = cleaned_df[numeric_cols].to_numpy(dtype=np.float64, copy=True)
+        means = np.nanmean(arr, axis=0)
+        rows, cols = np.where(np.isnan(arr))
+        arr[rows, cols] = np.take(means, cols)
+        cleaned_df[numeric_cols] = arr
+
+    # Fill missing categorical values with mode
+    if "Fill missing values (categorical)" in selected_options:
+        cat_cols = cleaned_df.select_dtypes(include=['object']).columns
+        # Find each column's most frequent value with value_counts
+        # (one O(N) traversal, where mode() sorts) and dispatch a
+        # single fillna call covering every affected column
+        modes = {col: cleaned_df[col].value_counts(dropna=True).idxmax()
+                 for col in cat_cols if cleaned_df[col].isna().any()}
+        if modes:
+            cleaned_df.fillna(modes, inplace=True)
+
+    # Drop any row that still contains missing values
+    if "Remove rows with missing values" in selected_options:
+        cleaned_df.dropna(inplace=True)
+
+    # Drop columns where more than 30% of values are missing
+    if "Remove columns with high missing values (>30%)" in selected_options:
+        threshold = len(cleaned_df) * 0.3
+        cleaned_df.dropna(axis=1, thresh=threshold, inplace=True)
+
+    # Convert any column with numeric text to actual numeric type
+    if "Convert text to numeric where possible" in selected_options:
+        for col in cleaned_df.columns:
+            if cleaned_df[col].dtype == 'object':
+                converted = try_numeric(cleaned_df[col])
+                if converted is not None:
+                    cleaned_df[col] = converted
+
+    # Remove outliers using the 3-standard-deviation rule, filtering
+    # all numeric columns with one combined mask instead of re-slicing
+    # the DataFrame once per column
+    if "Remove outliers (for numeric columns)" in selected_options:
+        numeric_cols = cleaned_df.select_dtypes(include='number').columns
+        # Work on one contiguous NumPy block: the comparisons and the
+        # row reduction then run in single vectorized passes
+        arr = cleaned_df[numeric_cols].to_numpy()
+        mean = np.nanmean(arr, axis=0)
+        std = np.nanstd(arr, axis=0, ddof=1)
+        mask = np.all((arr >= mean - 3 * std) & (arr <= mean + 3 * std), axis=1)
+        cleaned_df = cleaned_df.iloc[mask].copy()
+
+    # Rename all columns to lowercase with underscores (standard format)
+    if "Standardize column names" in selected_options:
+        cleaned_df.columns = cleaned_df.columns.str.strip().str.replace(" ", "_").str.capitalize()
+
+    # Store the repeated text columns as categoricals: integer codes
+    # plus a small string dictionary, so downstream value_counts,
+    # groupby and equality filters skip per-row string hashing
+    for col in ['Area', 'Crop', 'Item']:
+        if col in cleaned_df.columns:
+            cleaned_df[col] = cleaned_df[col].astype('category')
+
+    # Downcast wide numeric columns: float32 (and int16 for Year) halve
+    # the bytes the later corr/groupby/scaling passes pull through memory
+    for col in cleaned_df.select_dtypes(include='float64').columns:
+        cleaned_df[col] = cleaned_df[col].astype(np.float32)
+    # Only downcast Year when it is numeric with no NaNs left — the fill
+    # and convert options are all optional, and casting a NaN-bearing or
+    # text column to int16 would raise
+    if ('Year' in cleaned_df.columns
+            and pd.api.types.is_numeric_dtype(cleaned_df['Year'])
+            and cleaned_df['Year'].notna().all()):
+        cleaned_df['Year'] = cleaned_df['Year'].astype(np.int16)
+
+    return cleaned_df
+
 # Step 1: Upload or Load Dataset
 if options == "Upload Data":
     st.header("Upload or Select Dataset")
@@ -61,11 +725,12 @@ if options == "Upload Data":
         # Process uploaded file if provided
         if uploaded_file:
             try:
-                # Read based on file type
+                # Read based on file type; hash the raw bytes so the cached
+                # parse is reused when the same file is uploaded again
                 if uploaded_file.name.endswith(".csv"):
-                    df = pd.read_csv(uploaded_file)
+                    df = load_csv(uploaded_file.getvalue())
                 else:
-                    df = pd.read_excel(uploaded_file)
+                    df = load_excel(uploaded_file.getvalue())
 
                 st.success("File uploaded and read successfully.")
             except Exception as e:
@@ -75,7 +740,7 @@ if options == "Upload Data":
     # CASE 2: Load default dataset from project directory
     else:
         try:
-            df = pd.read_csv("yield_df.csv")  # Ensure this file is available in the working folder
+            df = load_default_dataset("yield_df.csv")  # Ensure this file is available in the working folder
             st.success("Default dataset loaded successfully.")
         except FileNotFoundError:
             st.error("Default dataset not found in the directory.")
@@ -87,7 +752,7 @@ if options == "Upload Data":
         # Provide downloadable blank template CSV with only column headers
         st.download_button(
             label="Download Example Dataset",
-            data=pd.DataFrame(columns=expected_columns).to_csv(index=False),
+            data=template_csv,
             file_name='example_crop_data.csv',
             mime='text/csv'
         )
@@ -108,19 +773,28 @@ if options == "Upload Data":
                 df = df[expected_columns]  # Keep only necessary columns
                 st.warning(f"Extra columns dropped: {extra_columns}")
 
+            # Define common missing value representations not detected by default (e.g., 'NA', '-', '', etc.)
+            missing_values = ['NA', 'na', 'n/a', 'N/a', '', 'null', '-']
+            # Replace all custom missing value indicators with np.nan in a
+            # single vectorized pass instead of one replace call per column
+            df = df.replace(missing_values, np.nan)
+
             # Store valid DataFrame in session state for reuse in other steps
             st.session_state.df = df
 
             # Display feedback and data summaries
             st.success("Dataset is valid and ready for analysis!")
 
+            # Profile the dataframe once; reruns reuse the cached result
+            dtypes_df, describe_df, missing_counts, dup_count = compute_summary(df)
+
             # Data preview (first 5 rows)
             st.subheader("Data Preview")
             st.dataframe(df.head())
 
             # Show data types of all columns
             st.subheader("Data Types")
-            st.dataframe(pd.DataFrame(df.dtypes, columns=["Data Type"]))
+            st.dataframe(dtypes_df)
 
             # Basic info: number of rows and columns
             st.subheader("Dataset Overview")
@@ -128,26 +802,24 @@ if options == "Upload Data":
 
             # Descriptive statistics for all columns
             st.subheader("Descriptive Statistics")
-            st.dataframe(df.describe(include='all'))
+            st.dataframe(describe_df)
 
             # Section: Missing Values Summary
             st.subheader("Missing Values")
-            # Define common missing value representations not detected by default (e.g., 'NA', '-', '', etc.)
-            missing_values = ['NA', 'na', 'n/a', 'N/a', '', 'null', '-']
-            # Replace all custom missing value indicators with np.nan
-            for column in df.columns:
-                df[column] = df[column].replace(missing_values, np.nan)
             # Create a summary DataFrame of missing values
-            missing_df = pd.DataFrame(df.isna().sum(), columns=['Missing Values'])
+            missing_df = pd.DataFrame(missing_counts, columns=['Missing Values'])
             missing_df["Percentage (%)"] = (missing_df['Missing Values'] / len(df)) * 100
             missing_df = missing_df[missing_df['Missing Values'] > 0]  # Show only columns with missing data
             # Display the missing values summary table in the Streamlit app
-            st.dataframe(missing_df.style.format({"Percentage (%)": "{:.2f}"}))
+            # Preformat the percentage as a plain string column: Styler builds
+            # HTML per cell on every rerun, which is the slow path for wide frames
+            missing_df['Percentage (%)'] = missing_df['Percentage (%)'].map('{:.2f}'.format)
+            st.dataframe(missing_df)
 
 
             # Count and show number of duplicate rows
             st.subheader("Duplicate Rows")
-            st.write(f"Number of duplicate rows: {df.duplicated().sum()}")
+            st.write(f"Number of duplicate rows: {dup_count}")
             
 # Step 2: Data Cleaning
 elif options == "Data Cleaning":
@@ -167,23 +839,22 @@ elif options == "Data Cleaning":
             issues.append(f"Missing values detected: {total_missing} total")    
 
         # 2. Check for Duplicate Rows
-        duplicates = df.duplicated().sum()
+        duplicates, _ = dup_report(df)
         if duplicates > 0:
             issues.append(f"Duplicate rows detected: {duplicates}")
 
-        # 3. Outlier Detection using IQR method
-        numeric_cols = df.select_dtypes(include=['int64', 'float64']).columns
-        outlier_cols = []  # Keep track of columns that contain outliers
+        # 3. Outlier Detection using IQR method, vectorized across all numeric
+        # columns in one pass instead of re-scanning the DataFrame per column
+        num = df.select_dtypes(include=['int64', 'float64'])
+        Q1 = num.quantile(0.25)
+        Q3 = num.quantile(0.75)
+        IQR = Q3 - Q1
+        # Boolean mask of outliers, reduced to the columns that contain any
+        outlier_mask = num.lt(Q1 - 1.5 * IQR) | num.gt(Q3 + 1.5 * IQR)
+        outlier_cols = outlier_mask.columns[outlier_mask.any(axis=0)].tolist()
 
-        for col in numeric_cols:
-            Q1 = df[col].quantile(0.25)
-            Q3 = df[col].quantile(0.75)
-            IQR = Q3 - Q1
-            outliers = df[(df[col] < (Q1 - 1.5 * IQR)) | (df[col] > (Q3 + 1.5 * IQR))]
-
-            if not outliers.empty:
-                issues.append(f"Potential outliers detected in '{col}'")
-                outlier_cols.append(col)
+        for col in outlier_cols:
+            issues.append(f"Potential outliers detected in '{col}'")
 
         # Visualize detected outliers using boxplots
         if outlier_cols:
@@ -196,11 +867,8 @@ elif options == "Data Cleaning":
 
         # 4. Check for numeric data stored as text
         for col in df.select_dtypes(include='object').columns:
-            try:
-                pd.to_numeric(df[col])  # Attempt conversion
+            if try_numeric(df[col]) is not None:
                 issues.append(f"Column '{col}' contains numeric data stored as text")
-            except:
-                pass  # If conversion fails, ignore
 
         # Display detected issues
         if issues:
@@ -233,74 +901,15 @@ elif options == "Data Cleaning":
 
         # Button to apply selected cleaning steps
         if st.button("Clean Data"):
-            cleaned_df = df.copy()  # Work on a copy of the dataset
-
-            if "Fixing Column Types" in cleaning_options:
-                # Fix incompatible column types before using st.dataframe()
-                for col in df.columns:
-                    if df[col].dtype == 'object':
-                        # Attempt to convert if values are numeric-like
-                        try:
-                            df[col] = pd.to_numeric(df[col])
-                        except:
-                            df[col] = df[col].astype(str)
-
-            # Change Items to Crop
-            if "Rename 'Items' to 'Crop'" in cleaning_options:
-                cleaned_df.rename(columns={'Item':'Crop'}, inplace=True)
-            
-            # Remove duplicates
-            if "Remove duplicate rows" in cleaning_options:
-                cleaned_df = cleaned_df.drop_duplicates()
-
-            # Fill missing numeric values with column mean
-            if "Fill missing values (numeric)" in cleaning_options:
-                from sklearn.impute import SimpleImputer
-                numeric_cols = cleaned_df.select_dtypes(include=['int64', 'float64']).columns
-                imputer = SimpleImputer(strategy='mean')
-                cleaned_df[numeric_cols] = imputer.fit_transform(cleaned_df[numeric_cols])
-
-            # Fill missing categorical values with mode
-            if "Fill missing values (categorical)" in cleaning_options:
-                cat_cols = cleaned_df.select_dtypes(include=['object']).columns
-                for col in cat_cols:
-                    if cleaned_df[col].isnull().sum() > 0:
-                        cleaned_df[col].fillna(cleaned_df[col].mode()[0], inplace=True)
-
-            # Drop any row that still contains missing values
-            if "Remove rows with missing values" in cleaning_options:
-                cleaned_df.dropna(inplace=True)
-
-            # Drop columns where more than 30% of values are missing
-            if "Remove columns with high missing values (>30%)" in cleaning_options:
-                threshold = len(cleaned_df) * 0.3
-                cleaned_df.dropna(axis=1, thresh=threshold, inplace=True)
-
-            # Convert any column with numeric text to actual numeric type
-            if "Convert text to numeric where possible" in cleaning_options:
-                for col in cleaned_df.columns:
-                    if cleaned_df[col].dtype == 'object':
-                        try:
-                            cleaned_df[col] = pd.to_numeric(cleaned_df[col])
-                        except:
-                            pass  # Ignore conversion errors
-
-            # Remove outliers using the 3-standard-deviation rule
-            if "Remove outliers (for numeric columns)" in cleaning_options:
-                for col in cleaned_df.select_dtypes(include=['int64', 'float64']).columns:
-                    mean = cleaned_df[col].mean()
-                    std = cleaned_df[col].std()
-                    cleaned_df = cleaned_df[
-                        (cleaned_df[col] <= mean + 3 * std) &
-                        (cleaned_df[col] >= mean - 3 * std)
-                    ]
-
-            # Rename all columns to lowercase with underscores (standard format)
-            if "Standardize column names" in cleaning_options:
-                cleaned_df.columns = cleaned_df.columns.str.strip().str.replace(" ", "_").str.capitalize()
-                
-            # Save cleaned data to session state for reuse in later steps
-            st.session_state.cleaned_df = cleaned_df
+            # Run the cached pipeline; identical data + options hit the cache
+            cleaned_df = clean_data(df, tuple(cleaning_options))
+
+            # Persist to Parquet and keep the cache-shared copy in session
+            # state, so later steps and other sessions reference one frame
+            cleaned_df.to_parquet(cleaned_parquet_path)
+            st.session_state.cleaned_df = load_cleaned(
+                cleaned_parquet_path, os.path.getmtime(cleaned_parquet_path))
+            cleaned_df = st.session_state.cleaned_df
 
             # Display cleaning result
             st.success("Data cleaning completed successfully!")
@@ -334,467 +943,180 @@ elif options == "Visualization":
         if 'Crop' in df.columns:
             st.subheader("Crop Distribution")
             # Count the occurences of each crop
-            crops=df['Crop'].value_counts()
-            # Create a figure
-            fig, ax = plt.subplots(figsize=(10, 10))
-            
-            # Slightly explode each slice for visual seperation
-            explode = [0.05] * len(crops)
-            # Plot the pie chart
-            ax.pie(crops, labels=crops.index,
-                   autopct='%1.1f%%',
-                   startangle=140,
-                   explode=explode, 
-                   textprops={'fontsize': 20})
-            # Add title
-            ax.set_title('Crop Distribution (Pie)', fontsize=20)
-            # Display the chart in streamlit
-            def display_and_close(fig):
-                st.pyplot(fig)
-                plt.close(fig)
-            display_and_close(fig)
-
-            def style_axis_ticks(ax, axis='x', rotation=None, fontsize=12):
-                if axis == 'x':
-                    for tick in ax.get_xticklabels():
-                        if rotation is not None:
-                            tick.set_rotation(rotation)
-                        tick.set_fontsize(fontsize)
-                elif axis == 'y':
-                    for tick in ax.get_yticklabels():
-                        if rotation is not None:
-                            tick.set_rotation(rotation)
-                        tick.set_fontsize(fontsize)
-
+            crops = agg_value_counts(df, 'Crop')
+            # Display the cached chart in streamlit
+            st.pyplot(fig_crop_pie(crops))
 
             # Bar Chart
             # Convert to DataFrame for seaborn
             crop_df = crops.reset_index()
             crop_df.columns = ['Crop','Frequency']
-            # Create the bar plot
-            fig, ax = plt.subplots(figsize=(8, 8))
-            sns.barplot(
-                x='Crop',
-                y='Frequency',
-                data=crop_df,
-                palette='Spectral',
-                hue=crops.index)
-            # Style the plot
-            style_axis_ticks(ax, axis='x', rotation=80, fontsize=14)
-            style_axis_ticks(ax, axis='y', fontsize=14)
-            ax.set_xlabel('Crop', fontsize=16)
-            ax.set_ylabel('Frequency', fontsize=16)
-            ax.set_title('Crop Frequency Bar Chart', fontsize=17)
-            # Layout and display
-            plt.tight_layout()
-            display_and_close(fig)
+            st.pyplot(fig_crop_bar(crop_df))
 
         st.subheader("Area Disribution")
-        # Set figure size: wide vertically for long lists of areas
-        fig, ax = plt.subplots(figsize=(7, 13))
-        # Create a countplot showing the number of occurrences for each 'Area'
-        sns.countplot(data=df,y='Area',palette='husl',hue='Area')
-        # Adjust y-axis tick font size for better readability
-        style_axis_ticks(ax, axis='y', fontsize=8)
-        # Add labels and title for clarity
-        ax.set_xlabel('Frequency', fontsize=12)
-        ax.set_ylabel('Area', fontsize=12)
-        ax.set_title('Distribution of Records by Area', fontsize=14)
-        # Adjust layout to prevent overlapping
-        plt.tight_layout()
-        # Display the plot
-        display_and_close(fig)
+        st.pyplot(fig_area_count(df))
 
         # Top 20 Areas
         st.subheader("Top 20 Areas by Frequency")
         # Get top 20 most frequent Areas
-        top_areas = df['Area'].value_counts().head(20)
-        # Create a new figure
-        fig, ax = plt.subplots(figsize=(8, 8))
-        # Plot a bar chart of the top 20 Areas
-        sns.barplot(x=top_areas.index, y=top_areas.values, palette='coolwarm',hue=top_areas.index)
-        # Rotate x-axis labels and set font size for readability
-        ax.set_xticklabels(ax.get_xticklabels(), rotation=80, fontsize=12)
-        # Set axis labels and title
-        ax.set_xlabel('Area', fontsize=14)
-        ax.set_ylabel('Frequency', fontsize=14)
-        ax.set_title('Top 20 Areas', fontsize=15)
-        # Optimize layout
-        plt.tight_layout()
-        # Show the plot
-        st.pyplot(fig)
-        
+        top_areas = agg_value_counts(df, 'Area').head(20)
+        st.pyplot(fig_top_areas(top_areas))
+
         # Least 20 Areas
         st.subheader("Least 20 Areas by Frequency")
-        # Get top 20 most frequent Areas
-        least_areas = df['Area'].value_counts().tail(20)
-        # Create a new figure
-        fig, ax = plt.subplots(figsize=(8, 8))
-        # Plot a bar chart of the top 20 Areas
-        sns.barplot(x=least_areas.index, y=least_areas.values, palette='viridis',hue=least_areas.index)
-        # Rotate x-axis labels and set font size for readability
-        ax.set_xticklabels(ax.get_xticklabels(), rotation=80, fontsize=12)
-        # Set axis labels and title
-        ax.set_xlabel('Area', fontsize=14)
-        ax.set_ylabel('Frequency', fontsize=14)
-        ax.set_title('Least 20 Areas', fontsize=14)
-        # Optimize layout
-        plt.tight_layout()
-        # Show the plot
-        st.pyplot(fig)  
-
-        # Yield Trends Over Time 
+        # Get least 20 most frequent Areas
+        least_areas = agg_value_counts(df, 'Area').tail(20)
+        st.pyplot(fig_least_areas(least_areas))
+
+        # Yield Trends Over Time
         st.subheader("Yearly Yield Trends")
         # Group data by 'Year' and calculate the mean of 'hg/ha_yield'
-        yearly_yield = df.groupby('Year')['Hg/ha_yield'].mean()
-        # Create a line plot of average yield over time
-        fig, ax = plt.subplots(figsize=(8, 5))
-        yearly_yield.plot(ax=ax, color='orange', linewidth=2, marker='o')
-        # Set chart title and axis labels
-        ax.set_title('Average Crop Yield per Year (hg/ha)', fontsize=16)
-        ax.set_xlabel('Year', fontsize=14)
-        ax.set_ylabel('Average Yield (hg/ha)', fontsize=14)
-        ax.set_xticklabels(ax.get_xticklabels(), fontsize=12)
-        ax.set_yticklabels(ax.get_yticklabels(), fontsize=12)
-        # Add grid for better visual guidance
-        ax.grid(True, linestyle='--', alpha=0.6)
-        # Optimize layout
-        plt.tight_layout()
-        # Display the plot
-        st.pyplot(fig)
+        yearly_yield = agg_mean(df, 'Year', 'Hg/ha_yield')
+        st.pyplot(fig_yearly_yield(yearly_yield))
 
         # Maximum Yield per Crop
         st.subheader("Max Yield per Crop by Area")
-        # Group by Crop and get the row with the highest yield per crop
-        best_crop = df.loc[df.groupby('Crop')['Hg/ha_yield'].idxmax()][['Crop', 'Area', 'Hg/ha_yield']]
-        # Create a bar plot of maximum yield per crop
-        fig, ax = plt.subplots(figsize=(8, 8))
-        sns.barplot(data=best_crop,x='Area', y='Hg/ha_yield', hue='Crop')
-        # Set the title and axis labels
-        ax.set_title('Maximum Yield per Crop by Area (hg/ha)', fontsize=16)
-        ax.set_xlabel('Area', fontsize=14)
-        ax.set_ylabel('Maximum Yield (hg/ha)', fontsize=14)
-        # Adjust tick label font sizes
-        ax.set_xticklabels(ax.get_xticklabels(), fontsize=12, rotation=45)
-        ax.set_yticklabels(ax.get_yticklabels(), fontsize=12)
-        # Resize and position the hue legend
-        ax.legend(title='Crop', title_fontsize=12, fontsize=10, loc='upper right', bbox_to_anchor=(1.15, 1))
-        # Tidy up layout
-        plt.tight_layout()
-        # Display the plot
-        st.pyplot(fig)
+        # Keep the row with the highest yield per crop: project the three
+        # needed columns first, sort once by yield, and keep each crop's
+        # first row instead of an idxmax scan plus full-frame gather
+        best_crop = (df[['Crop', 'Area', 'Hg/ha_yield']]
+                     .sort_values('Hg/ha_yield', ascending=False, kind='stable')
+                     .drop_duplicates('Crop', keep='first'))
+        st.pyplot(fig_best_crop(best_crop))
 
         # Total Yield by Crop
         st.subheader("Total Yield by Crop Type")
         # Group by crop and calculate **total** yield
-        yield_per_crop = df.groupby('Crop')['Hg/ha_yield'].sum()
-        # Plot using Seaborn
-        fig, ax= plt.subplots(figsize=(10, 6))
-        sns.barplot(x=yield_per_crop.values, y=yield_per_crop.index, color='orange', ax=ax)
-        # Set the title and axis labels
-        ax.set_title('Total Crop Yield (hg/ha)',  fontsize=16)
-        ax.set_xlabel('Yield (hg/ha)', fontsize=14)
-        ax.set_ylabel('Crop', fontsize=14)
-        # Optimize layout
-        plt.tight_layout()
-        st.pyplot(fig)
+        yield_per_crop = agg_sum(df, 'Crop', 'Hg/ha_yield')
+        st.pyplot(fig_yield_per_crop(yield_per_crop))
 
         # Average Yield by Area
         st.subheader("Average Yield by Area")
         # Group by Area and compute average yield
-        area_avg = df.groupby('Area')['Hg/ha_yield'].mean().reset_index()
+        area_avg = agg_mean(df, 'Area', 'Hg/ha_yield').reset_index()
         area_avg.columns = ['Area', 'Hg/ha_yield']
         # Find the country/area with the best average yield
         best_area = area_avg.loc[area_avg['Hg/ha_yield'].idxmax()]
         st.write("Country/Area with the best average yield:")
         st.write(best_area)
         # Plot average yield per area
-        fig, ax = plt.subplots(figsize=(7, 13))
-        sns.barplot(data=area_avg, x='Hg/ha_yield', y='Area', hue='Area', palette="viridis")
-        # Set the title and axis labels
-        ax.set_yticklabels(ax.get_yticklabels(), fontsize=9)
-        ax.set_xlabel('Average Yield (hg/ha)', fontsize=12)
-        ax.set_ylabel('Area', fontsize=12)
-        ax.set_title('Average Crop Yield by Area', fontsize=14)
-        # Optimize layout
-        plt.tight_layout()
-        st.pyplot(fig)
+        st.pyplot(fig_area_avg(area_avg))
 
         # Rainfall Trends
         st.subheader("Average Rainfall per Year")
-        # Group data by 'Year' and calculate the mean of 'hg/ha_yield'
-        rainfall_year = df.groupby('Year')['Average_rain_fall_mm_per_year'].mean()
-        # Create a line plot of average yield over time
-        fig, ax = plt.subplots(figsize=(8, 5))
-        rainfall_year.plot(color='red', linewidth=2, marker='o')
-        # Set chart title and axis labels
-        ax.set_title('Average Rainfall per Year', fontsize=16)
-        ax.set_xlabel('Year', fontsize=14)
-        ax.set_ylabel('Average Rainfall (mm)', fontsize=14)
-        ax.set_xticklabels(ax.get_xticklabels(), fontsize=12)
-        ax.set_yticklabels(ax.get_yticklabels(), fontsize=12)
-        # Add grid for better visual guidance
-        ax.grid(True, linestyle='--', alpha=0.6)
-        # Optimize layout
-        plt.tight_layout()
-        # Display the plot
-        st.pyplot(fig)
+        # Group data by 'Year' and calculate the mean rainfall
+        rainfall_year = agg_mean(df, 'Year', 'Average_rain_fall_mm_per_year')
+        st.pyplot(fig_rainfall_year(rainfall_year))
 
         # Top 10 Areas by Rainfall
         st.subheader("Top 10 Areas by Avg Rainfall")
         # Group by Area and calculate average rainfall
-        top_rain = df.groupby('Area')['Average_rain_fall_mm_per_year'].mean()
+        top_rain = agg_mean(df, 'Area', 'Average_rain_fall_mm_per_year')
         # Sort in descending order and get the top 10
         top10_avg_rainfall = top_rain.sort_values(ascending=False).head(10)
         # Convert to DataFrame for better handling
         top10_df = top10_avg_rainfall.reset_index()
         top10_df.columns = ['Area', 'Average_Rainfall']
-        # Plot
-        fig, ax = plt.subplots(figsize=(9,7))
-        sns.barplot(data=top10_df, x='Average_Rainfall', y='Area', 
-                    palette='dark:orange', hue='Area')
-        # Chart styling
-        ax.set_title('Top 10 Countries by Average Rainfall', fontsize=18)
-        ax.set_xlabel('Average Rainfall (mm/year)', fontsize=15)
-        ax.set_ylabel('Country/Area', fontsize=15)
-        ax.set_xticklabels(ax.get_xticklabels(), fontsize=14)
-        ax.set_yticklabels(ax.get_yticklabels(), fontsize=14)
-        plt.tight_layout()
-        st.pyplot(fig)
+        st.pyplot(fig_top10_rainfall(top10_df))
 
         # Rainfall vs Yield
         st.subheader("Rainfall vs Crop Yield")
-        # Plot
-        fig, ax = plt.subplots(figsize=(10, 6))
-        sns.scatterplot(data=df, x='Average_rain_fall_mm_per_year', 
-                        y='Hg/ha_yield', hue='Crop', alpha=0.6, ax=ax)
-        ax.set_title('Effect of Rainfall on Crop Yield', fontsize=16)
-        ax.set_xlabel('Average Rainfall (mm/year)', fontsize=14)
-        ax.set_ylabel('Yield (hg/ha)', fontsize=14)
-        ax.set_xticklabels(ax.get_xticklabels(), fontsize=14)
-        ax.set_yticklabels(ax.get_yticklabels(), fontsize=14)
-        ax.legend(title='Country/Area', bbox_to_anchor=(1.05, 1), loc='upper left')
-        # plt.tight_layout()
-        st.pyplot(fig)                                                 
-
-        # Trend by Selected Crop 
-        st.subheader("Trend Analysis by Crop")        
-        # Filter the DataFrame by the selected crop
-        selected_crop = st.selectbox("Select a Crop", sorted(df['Crop'].unique()))
-        df_crop = df[df['Crop'] == selected_crop]
-        
-        crop_metrics = {'Hg/ha_yield': ('Yield (hg/ha)', 'blue'),
-            'Pesticides_tonnes': ('Pesticides (tonnes)', 'black'),
-            'Average_rain_fall_mm_per_year': ('Rainfall (mm)', 'red'),
-            'Avg_temp': ('Avg Temperature (°C)', 'orange')}
-        
-        # Loop through each metric and create a time series plot
-        for col, (label, color) in crop_metrics.items():
-            fig, ax = plt.subplots(figsize=(10, 6))
-            # Plot mean values grouped by year
-            df_crop.groupby('Year')[col].mean().plot(ax=ax, color=color, marker='o')
-            # Add plot formatting
-            ax.set_title(f"{label} over Years for {selected_crop}", fontsize=16)
-            ax.set_xlabel("Year", fontsize=14)
-            ax.set_ylabel(label, fontsize=14)
-            for label in ax.get_xticklabels():
-                label.set_fontsize(14)
-            for label in ax.get_yticklabels():
-                label.set_fontsize(14)
-            ax.legend()
-            ax.grid(True)
-            # Display the plot
-            plt.tight_layout()
-            # Display the plot in Streamlit
-            st.pyplot(fig)    
-    
-        # Country Specific Yield Trend 
-        st.subheader("Country-Specific Yield Trends")
-        selected_country = st.selectbox("Select a Country", sorted(df['Area'].unique()))
-        filtered = df[df['Area'] == selected_country]
-        fig, ax = plt.subplots()
-        sns.lineplot(data=filtered, x='Year', y='Hg/ha_yield', hue='Crop', marker='o', ax=ax)
-        ax.set_title(f"Crop Yield Over Time in {selected_country}", fontsize=16)
-        ax.set_xlabel("Year", fontsize=14)
-        ax.set_ylabel("Yield (hg/ha)", fontsize=14)
-        for label in ax.get_xticklabels():
-            label.set_fontsize(14)
-        for label in ax.get_yticklabels():
-            label.set_fontsize(14)
-        st.pyplot(fig)
+        st.pyplot(fig_rain_vs_yield(df))
+
+        # Trend by Selected Crop, scoped to a fragment: changing the crop
+        # reruns only this block instead of the whole Visualization page
+        @st.fragment
+        def crop_trend_block(df):
+            st.subheader("Trend Analysis by Crop")
+            # Filter the DataFrame by the selected crop
+            selected_crop = st.selectbox("Select a Crop", sorted(df['Crop'].unique()))
+            df_crop = df.take(group_indices(df, 'Crop')[selected_crop])
+
+            crop_metrics = {'Hg/ha_yield': ('Yield (hg/ha)', 'blue'),
+                'Pesticides_tonnes': ('Pesticides (tonnes)', 'black'),
+                'Average_rain_fall_mm_per_year': ('Rainfall (mm)', 'red'),
+                'Avg_temp': ('Avg Temperature (°C)', 'orange')}
+
+            # Loop through each metric and create a time series plot
+            for col, (label, color) in crop_metrics.items():
+                crop_yearly = df_crop.groupby('Year')[col].mean()
+                st.pyplot(fig_crop_metric(crop_yearly, selected_crop, label, color))
+
+        crop_trend_block(df)
+
+        # Country Specific Yield Trend, likewise fragment-scoped
+        @st.fragment
+        def country_trend_block(df):
+            st.subheader("Country-Specific Yield Trends")
+            selected_country = st.selectbox("Select a Country", sorted(df['Area'].unique()))
+            filtered = df.take(group_indices(df, 'Area')[selected_country])
+            st.pyplot(fig_country_trend(filtered, selected_country))
+
+        country_trend_block(df)
 
         # Pesticide Usage
         st.subheader("Pesticide Usage Overview")
         with st.expander("Top Countries by Pesticide Use"):
-            top_pesticide = df.groupby('Area')['Pesticides_tonnes'].sum().sort_values(ascending=False).head(10)
-            fig, ax = plt.subplots()
-            sns.barplot(x=top_pesticide.values, y=top_pesticide.index, 
-                        palette="Reds_r", ax=ax, hue= top_pesticide.index)
-            ax.set_title("Top 10 Countries by Pesticide Use", fontsize=16)
-            ax.set_xlabel("Total Pesticides Used (tonnes)", fontsize=14)
-            ax.set_ylabel("Country", fontsize=14)
-            for label in ax.get_xticklabels():
-                label.set_fontsize(14)
-            for label in ax.get_yticklabels():
-                label.set_fontsize(14)
-            st.pyplot(fig)        
+            top_pesticide = agg_sum(df, 'Area', 'Pesticides_tonnes').sort_values(ascending=False).head(10)
+            st.pyplot(fig_top_pesticide(top_pesticide))
 
         with st.expander("Global Pesticide Use Over Time"):
-            pesticide_trend = df.groupby('Year')['Pesticides_tonnes'].sum()
-            fig, ax = plt.subplots()
-            sns.lineplot(x=pesticide_trend.index, y=pesticide_trend.values, marker='o', ax=ax)
-            ax.set_title("Pesticide Use Over Time", fontsize=16)
-            ax.set_xlabel("Year", fontsize=14)
-            ax.set_ylabel("Global Pesticide Use Over Time", fontsize=14)
-            for label in ax.get_xticklabels():
-                label.set_fontsize(14)
-            for label in ax.get_yticklabels():
-                label.set_fontsize(14)
-            st.pyplot(fig)
+            pesticide_trend = agg_sum(df, 'Year', 'Pesticides_tonnes')
+            st.pyplot(fig_pesticide_trend(pesticide_trend))
 
         # Crop with Most Pesticide
         with st.expander("Crops With Most Pesticide Used"):
-            crop_pesticide = df.groupby('Crop')['Pesticides_tonnes'].sum().sort_values(ascending=False).head(10)
-            fig, ax = plt.subplots()
-            sns.barplot(x=crop_pesticide.values, y=crop_pesticide.index, palette="YlOrBr", 
-                        ax=ax, hue=crop_pesticide.index)
-            ax.set_title("Top 10 Crops by Pesticide Use", fontsize=16)
-            ax.set_xlabel('Total Pesticides Used (tonnes)', fontsize=14)
-            ax.set_ylabel('Crop', fontsize=14)
-            plt.tight_layout()
-            for label in ax.get_xticklabels():
-                label.set_fontsize(14)
-            for label in ax.get_yticklabels():
-                label.set_fontsize(14)
-            st.pyplot(fig)
-        
+            crop_pesticide = agg_sum(df, 'Crop', 'Pesticides_tonnes').sort_values(ascending=False).head(10)
+            st.pyplot(fig_crop_pesticide(crop_pesticide))
+
         # Yield & Environment
         st.header("Yield vs Environment")
         with st.expander("Effect of Pesticide on Crop Yield"):
-            fig, ax = plt.subplots()
-            sns.scatterplot(data=df, x='Pesticides_tonnes', y='Hg/ha_yield', hue='Crop', ax=ax)
-            ax.set_title("Pesticide vs Crop Yield", fontsize=16)
-            ax.set_xlabel("Pesticides (tonnes)", fontsize=14)
-            ax.set_ylabel("Yield (hg/ha)",fontsize=14)
-            for label in ax.get_xticklabels():
-                label.set_fontsize(14)
-            for label in ax.get_yticklabels():
-                label.set_fontsize(14)
-            st.pyplot(fig)
-        
+            st.plotly_chart(fig_pesticide_vs_yield(df), use_container_width=True)
+
         with st.expander("Effect of Temperature on Yield"):
-            fig, ax = plt.subplots()
-            sns.scatterplot(data=df, x='Avg_temp', y='Hg/ha_yield', hue='Crop', ax=ax)
-            ax.set_title("Temperature vs Yield", fontsize=16)
-            ax.set_xlabel("Temperature (°C)", fontsize=14)
-            ax.set_ylabel("Yield (hg/ha)", fontsize=14)
-            for label in ax.get_xticklabels():
-                label.set_fontsize(14)
-            for label in ax.get_yticklabels():
-                label.set_fontsize(14)
-            st.pyplot(fig)
+            st.plotly_chart(fig_temp_vs_yield(df), use_container_width=True)
 
         # Rainfall & Temperature
         st.header("Rainfall and Temperature")
         col1, col2 = st.columns(2)
         with col1:
             st.subheader("Average Temperature by Year")
-            avg_temp_year = df.groupby('Year')['Avg_temp'].mean()
-            fig, ax = plt.subplots()
-            sns.lineplot(x=avg_temp_year.index, y=avg_temp_year.values, marker='o', ax=ax)
-            ax.set_title("Avg. Temperature Over Years", fontsize=16)
-            ax.set_xlabel("Year", fontsize=14)
-            ax.set_ylabel("Temperature (°C)", fontsize=14)
-            for label in ax.get_xticklabels():
-                label.set_fontsize(14)
-            for label in ax.get_yticklabels():
-                label.set_fontsize(14)
-            st.pyplot(fig)
-        
+            avg_temp_year = agg_mean(df, 'Year', 'Avg_temp')
+            st.pyplot(fig_avg_temp_year(avg_temp_year))
+
         with col2:
             st.subheader("Average Rainfall by Year")
-            avg_rain_year = df.groupby('Year')['Average_rain_fall_mm_per_year'].mean()
-            fig, ax = plt.subplots()
-            sns.lineplot(x=avg_rain_year.index, y=avg_rain_year.values, marker='o', ax=ax)
-            ax.set_title("Avg. Rainfall Over Years", fontsize=16)
-            ax.set_xlabel("Year", fontsize=14)
-            ax.set_ylabel("Rainfall (mm)", fontsize=14)
-            for label in ax.get_xticklabels():
-                label.set_fontsize(14)
-            for label in ax.get_yticklabels():
-                label.set_fontsize(14)
-            st.pyplot(fig)
+            avg_rain_year = agg_mean(df, 'Year', 'Average_rain_fall_mm_per_year')
+            st.pyplot(fig_avg_rain_year(avg_rain_year))
 
         # Pesticide vs Yield Scatterplot
         st.header("Pesticide Use vs Crop Yield")
-        avg_data_country = df.groupby('Area')[['Pesticides_tonnes', 'Hg/ha_yield']].mean().dropna()
-        fig, ax = plt.subplots()
-        sns.scatterplot(data=avg_data_country, x='Pesticides_tonnes', y='Hg/ha_yield')
-        ax.set_title('Average Pesticide Use vs Crop Yield by Country')
-        ax.set_xlabel('Average Pesticide Use (tonnes)')
-        ax.set_ylabel('Average Yield (hg/ha)')
-        st.pyplot(fig)
+        avg_data_country = agg_mean(df, 'Area', ['Pesticides_tonnes', 'Hg/ha_yield']).dropna()
+        st.pyplot(fig_country_pesticide_yield(avg_data_country))
 
         # Top 10 Countries by Average Temperature
         st.header("Top 10 Hottest Countries (Avg. Temp)")
         # Average temperature by country (Top 10 warmest)
-        fig, ax = plt.subplots()
-        avg_temp_country = df.groupby('Area')['Avg_temp'].mean().sort_values(ascending=False).head(10)
-        sns.barplot(x=avg_temp_country.values, y=avg_temp_country.index, palette="coolwarm", hue=avg_temp_country.index)
-        ax.set_title('Top 10 Countries by Average Temperature')
-        ax.set_xlabel('Average Temperature (°C)')
-        ax.set_ylabel('Country')
-        st.pyplot(fig)
-
-        # Set seaborn style
-        sns.set(style='whitegrid', palette='Set2')
+        avg_temp_country = agg_mean(df, 'Area', 'Avg_temp').sort_values(ascending=False).head(10)
+        st.pyplot(fig_avg_temp_country(avg_temp_country))
+
         # Rainfall vs Pesticide Use
         st.header("Rainfall vs Pesticide Use by Crop")
         # Scatterplot: Relationship between Rainfall and Pesticide Use
-        fig, ax = plt.subplots(figsize=(10, 6))
-        sns.scatterplot(data=df, x='Average_rain_fall_mm_per_year', y='Pesticides_tonnes', hue='Crop', alpha=0.7)
-        ax.set_title('Rainfall vs Pesticide Use by Crop')
-        ax.set_xlabel('Average Rainfall (mm/year)')
-        ax.set_ylabel('Pesticide Use (tonnes)')
-        ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
-        st.pyplot(fig)
-        
+        st.plotly_chart(fig_rain_vs_pesticide(df), use_container_width=True)
+
         # KDE + Barplot for Rainfall, Pesticides, Temperature, and Yield
-        st.header("Distributions: Rainfall, Pesticides, Temperature, and Yield")        
-        fig, axes = plt.subplots(2, 2, figsize=(16, 10))
-        sns.histplot(df['Average_rain_fall_mm_per_year'], kde=True, ax=axes[0, 0], color='blue')
-        axes[0, 0].set_title('Average Rainfall Distribution')
-        sns.histplot(df['Pesticides_tonnes'], kde=True, ax=axes[0, 1], color='green')
-        axes[0, 1].set_title('Pesticide Usage Distribution')
-        sns.histplot(df['Avg_temp'], kde=True, ax=axes[1, 0], color='orange')
-        axes[1, 0].set_title('Average Temperature Distribution')
-        sns.histplot(df['Hg/ha_yield'], kde=True, ax=axes[1, 1], color='purple')
-        axes[1, 1].set_title('Crop Yield Distribution')
-        plt.tight_layout()
-        st.pyplot(fig)
-        
+        st.header("Distributions: Rainfall, Pesticides, Temperature, and Yield")
+        st.pyplot(fig_distributions(df))
+
         # Boxplot: Temperature Needed by Various Crops
         st.header("Temperature Distribution by Crop")
-        fig, ax = plt.subplots(figsize=(12, 6))
-        sns.boxplot(data=df, x='Crop', y='Avg_temp', palette='coolwarm', hue='Crop')
-        ax.set_title('Temperature Distribution for Each Crop')
-        ax.set_xlabel('Crop')
-        ax.set_ylabel('Average Temperature (°C)')
-        for label in ax.get_xticklabels():
-            label.set_fontsize(14)
-        for label in ax.get_yticklabels():
-                label.set_fontsize(14)
-        st.pyplot(fig)
-        
+        st.pyplot(fig_temp_by_crop(df))
+
         # Average Yield per Year by Crop
-        st.header("Average Crop Yield per Year") 
-        fig, ax = plt.subplots(figsize=(14, 7))
-        sns.lineplot(data=df, x='Year', y='Hg/ha_yield', hue='Crop', estimator='mean', errorbar=None)
-        ax.set_title('Average Crop Yield per Year')
-        ax.set_xlabel('Year')
-        ax.set_ylabel('Yield (hg/ha)')
-        ax.legend(title='Crop', bbox_to_anchor=(1.05, 1), loc='upper left')
-        st.pyplot(fig)
+        st.header("Average Crop Yield per Year")
+        st.pyplot(fig_yearly_yield_by_crop(df))
     else:
         # Message shown if user tries to access this step before uploading data
         st.warning("Please upload a dataset first in the 'Upload Data' section.")
@@ -808,48 +1130,101 @@ elif options == "Preprocessing":
 
     # Ensure the cleaned dataframe exists in session state
     if st.session_state.cleaned_df is not None:
-        df = st.session_state.cleaned_df.copy()
+        df = st.session_state.cleaned_df
 
-        
-        st.subheader("Step 1: Encoding Categorical Features")
-        # Function to encode categorical features using LabelEncoder
+        # Function to encode categorical features in one C-level pass per
+        # column: columns the cleaning step already stored as category
+        # dtype reuse their existing codes for free, and anything still
+        # object-typed goes through pd.factorize, which builds the code
+        # array and the unique values in a single hash-table sweep.
+        # Returns the per-column value mappings so the Prediction step
+        # can apply the same encoding to user input.
         def encode_categorical(dataframe, columns):
-            encoder = LabelEncoder()
+            mappings = {}
             for col in columns:
-                dataframe[col] = encoder.fit_transform(dataframe[col])
-            return dataframe
-
-        # Identify categorical columns
-        categorical_columns = df.select_dtypes(include="object").columns.tolist()
+                series = dataframe[col]
+                if isinstance(series.dtype, pd.CategoricalDtype):
+                    dataframe[col] = series.cat.codes.astype(np.int16)
+                    mappings[col] = series.cat.categories
+                else:
+                    codes, uniques = pd.factorize(series, sort=False)
+                    dataframe[col] = codes.astype(np.int16)
+                    mappings[col] = pd.Index(uniques)
+            return dataframe, mappings
+
+        # Function to find highly correlated feature pairs above a
+        # threshold: the JIT-compiled triangle walk when numba is
+        # available, otherwise one vectorized pass over the upper
+        # triangle of |corr|
+        def find_high_correlation_pairs(corr_matrix, threshold=0.5):
+            arr = corr_matrix.to_numpy()
+            if _high_corr_pairs is not None:
+                pair_i, pair_j = _high_corr_pairs(arr, threshold)
+                i = np.asarray(pair_i, dtype=np.int64)
+                j = np.asarray(pair_j, dtype=np.int64)
+            else:
+                i, j = np.where(np.triu(np.abs(arr) >= threshold, k=1))
+            cols = corr_matrix.columns.to_numpy()
+            return list(zip(cols[i], cols[j], arr[i, j]))
+
+        # Function to drop one column from each highly correlated pair,
+        # built from the same upper-triangle mask: every column appearing
+        # second in a flagged pair is dropped
+        def drop_highly_correlated_features(dataframe, corr_matrix, threshold=0.5):
+            arr = corr_matrix.to_numpy()
+            _, j = np.where(np.triu(np.abs(arr) > threshold, k=1))
+            to_drop = corr_matrix.columns[np.unique(j)].tolist()
+            dataframe = dataframe.drop(columns=to_drop)
+            return dataframe, to_drop
+
+        # Function to normalize features with one vectorized mean/std
+        # pass on a float32 buffer, skipping StandardScaler's validation
+        # and float64 promotion; the column means and stds are returned
+        # so predictions can transform input the same way
+        def normalize_features(features):
+            arr = features.to_numpy(dtype=np.float32, copy=True)
+            # NaN-aware statistics like StandardScaler's: plain mean/std
+            # would turn a whole column NaN if any value is missing
+            mean = np.nanmean(arr, axis=0)
+            std = np.nanstd(arr, axis=0)
+            std[~(std > 0)] = 1.0  # Guard constant or all-NaN columns
+            arr -= mean
+            arr /= std
+            return pd.DataFrame(arr, columns=features.columns, index=features.index), (mean, std)
+
+        # The whole pipeline is deterministic given the cleaned frame, so
+        # it runs once per dataset: switching pages or touching widgets
+        # replays the cached results instead of re-encoding, recorrelating
+        # and rescaling on every rerun
+        @st.cache_data
+        def preprocess(cleaned):
+            encoded = cleaned.copy()
+            categorical_columns = encoded.select_dtypes(include=["object", "category"]).columns.tolist()
+            encoded, mappings = encode_categorical(encoded, categorical_columns)
+            correlation_matrix = corr_matrix(encoded)
+            high_corr = find_high_correlation_pairs(correlation_matrix, threshold=0.5)
+            reduced, dropped = drop_highly_correlated_features(encoded, correlation_matrix, threshold=0.5)
+            X = Y = scaler = None
+            if 'Hg/ha_yield' in reduced.columns:
+                X = reduced.drop('Hg/ha_yield', axis=1)
+                Y = reduced['Hg/ha_yield']
+                X, scaler = normalize_features(X)
+            return encoded, mappings, correlation_matrix, high_corr, dropped, X, Y, scaler
+
+        (df, mappings, correlation_matrix, high_corr_columns,
+         dropped_cols, X, Y, scaler) = preprocess(df)
 
-        # Encode them
-        df = encode_categorical(df, categorical_columns)
+        st.subheader("Step 1: Encoding Categorical Features")
+        if mappings:
+            st.session_state.encoder = mappings
         st.success("Categorical features encoded successfully!")
         st.dataframe(df.head())
 
         
         st.subheader("Step 2: Correlation Analysis")
-        # Compute correlation matrix
-        correlation_matrix = df.corr()
         # Visualize correlation matrix
-        fig, ax = plt.subplots(figsize=(8, 8))
-        sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', fmt='.2f', linewidths=0.5, ax=ax)
-        ax.set_title('Heatmap of Correlation Matrix', fontsize=18)
-        st.pyplot(fig)
+        st.pyplot(fig_corr_heatmap(correlation_matrix))
 
-        # Function to find highly correlated feature pairs above a threshold
-        def find_high_correlation_pairs(corr_matrix, threshold=0.5):
-            corr_pairs = []
-            columns = corr_matrix.columns
-            for i in range(len(columns)):
-                for j in range(i + 1, len(columns)):
-                    value = corr_matrix.iloc[i, j]
-                    if abs(value) >= threshold:
-                        corr_pairs.append((columns[i], columns[j], value))
-            return corr_pairs
-
-        # Check for highly correlated feature pairs (above or below ±0.5)
-        high_corr_columns = find_high_correlation_pairs(df.corr(), threshold=0.5)
         st.subheader("Highly Correlated Feature Pairs ≥ ±0.5)")
 
         if high_corr_columns:
@@ -858,22 +1233,6 @@ elif options == "Preprocessing":
         else:
             st.info("No highly correlated feature pairs found.")
 
-        # Function to drop one column from each highly correlated pair
-        def drop_highly_correlated_features(dataframe, corr_matrix, threshold=0.5):
-            to_drop = set()
-            for i in range(len(corr_matrix.columns)):
-                for j in range(i + 1, len(corr_matrix.columns)):
-                    col1 = corr_matrix.columns[i]
-                    col2 = corr_matrix.columns[j]
-                    if abs(corr_matrix.iloc[i, j]) > threshold:
-                        # Drop the second column in the pair
-                        to_drop.add(col2)
-            dataframe = dataframe.drop(columns=list(to_drop))
-            return dataframe, list(to_drop)
-
-        # Drop correlated features
-        df, dropped_cols = drop_highly_correlated_features(df, correlation_matrix, threshold=0.5)
-
         # Display dropped columns if any
         if dropped_cols:
             st.subheader("Dropped Highly Correlated Columns")
@@ -883,13 +1242,8 @@ elif options == "Preprocessing":
 
         st.subheader("Target and Feature Separation")
         # Ensure target column exists
-        if 'Hg/ha_yield' in df.columns:
+        if X is not None:
             st.write("Target Column Selected: `'Hg/ha_yield'`")
-
-            # Split into features and target
-            X = df.drop('Hg/ha_yield', axis=1)
-            Y = df['Hg/ha_yield']
-
             st.write("Feature Columns:")
             st.write(X.columns)
         else:
@@ -898,14 +1252,7 @@ elif options == "Preprocessing":
 
         
         st.subheader("Feature Scaling (Standard Normalization)")
-         # Function to normalize features
-        def normalize_features(features):
-            scaler = StandardScaler()
-            scaled = scaler.fit_transform(features)
-            return pd.DataFrame(scaled, columns=features.columns)
-
-        # Apply normalization
-        X = normalize_features(X)
+        st.session_state.scaler = scaler
         st.success("Features normalized successfully!")
 
         # Store processed features and target in session state
@@ -932,9 +1279,23 @@ elif options == "Preprocessing" and st.session_state.cleaned_df is None:
 
 # X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, test_size=test_size, random_state=int(random_state))
 
-# model = RandomForestClassifier()
-# model.fit(X_train, y_train)
-
+# # Cache the fitted model so reruns reuse it instead of retraining
+# @st.cache_resource
+# def train_model(model_choice, X_train, y_train):
+#     if model_choice == "Fast (HistGBT)":
+#         # Binned gradient boosting: much faster fit/predict on tabular data
+#         model = HistGradientBoostingClassifier(max_iter=200, early_stopping=True)
+#     else:
+#         # Parallel forest with bounded depth to keep fit and predict cheap
+#         model = RandomForestClassifier(n_estimators=200, n_jobs=-1, max_depth=20,
+#                                        min_samples_leaf=5, random_state=0)
+#     model.fit(X_train, y_train)
+#     return model
+
+# model_choice = st.radio("Model:", ["RandomForest", "Fast (HistGBT)"])
+# model = train_model(model_choice, X_train, y_train)
+
+# # Predict the held-out rows in one batch call (never row by row)
 # y_pred = model.predict(X_test)
 
 # # STEP 6: Evaluation
@@ -1,7 +1,11 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import seaborn as sns
+import matplotlib
+matplotlib.use('Agg')  # Headless backend: Streamlit never needs Tk/Qt init
 import matplotlib.pyplot as plt
+from scipy.stats import gaussian_kde
 
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder, StandardScaler
@@ -16,11 +20,117 @@ from helpers.verify_columns import verify
 from services.eda import EDA
 from services.cleaning import Cleaning
 
-from services.visualisation import pie_plot, bar_plot, count_plot, line_plot, scatter_plot
+from services.visualisation import pie_plot, bar_plot, count_plot, line_plot, scatter_plot, scatter_gl_plot
 
 dataset_url = "https://raw.githubusercontent.com/datasciencedojo/datasets/master/Agricultural%20Production.csv"
 
 
+# One cached sort per group key: repeated aggregates over the same key
+# reuse the presorted frame and pass sort=False, so groupby sees rows
+# already in key order and skips its internal key sort while the output
+# stays sorted as before
+@st.cache_data
+def sorted_by(df, col):
+    return df.sort_values(col, kind='stable')
+
+
+# Cached aggregates for the Visualization step: Streamlit reruns the whole
+# script on every widget interaction, so each groupby result is computed
+# once per dataset and served from cache on later reruns
+@st.cache_data
+def agg_mean(df, by, col):
+    # Project down to the key and value columns before sorting/grouping
+    # so the hash aggregation only moves the bytes it actually reduces
+    cols = [col] if isinstance(col, str) else list(col)
+    return sorted_by(df[[by] + cols], by).groupby(by, sort=False)[col].mean()
+
+
+@st.cache_data
+def agg_sum(df, by, col):
+    cols = [col] if isinstance(col, str) else list(col)
+    return sorted_by(df[[by] + cols], by).groupby(by, sort=False)[col].sum()
+
+
+# Stratified sample for the full-dataset scatter charts: matplotlib draws
+# each marker through its Python path machinery, so beyond a few thousand
+# points rendering dominates. A capped sample per hue class looks the
+# same at screen resolution and is cached per dataset.
+@st.cache_data
+def scatter_sample(df, hue, cap=500):
+    if len(df) <= cap * df[hue].nunique():
+        return df
+    rng = np.random.default_rng(0)
+    idx = np.concatenate([rng.choice(rows, size=min(len(rows), cap), replace=False)
+                          for rows in df.groupby(hue).indices.values()])
+    return df.take(np.sort(idx))
+
+
+# Lightweight histogram + KDE panel: one np.float32 pass through the
+# column for the counts and a gaussian_kde fitted on a capped subsample,
+# instead of letting sns.histplot re-sort and bandwidth-estimate each of
+# the four full columns independently. The density curve is scaled back
+# to counts so the panel looks like histplot(kde=True) did.
+def kde_hist(ax, series, color):
+    vals = series.to_numpy(dtype=np.float32)
+    vals = vals[np.isfinite(vals)]
+    counts, edges, _ = ax.hist(vals, bins=50, color=color, alpha=0.7)
+    sample = vals
+    if len(vals) > 5000:
+        sample = np.random.default_rng(0).choice(vals, 5000, replace=False)
+    kde = gaussian_kde(sample)
+    xs = np.linspace(edges[0], edges[-1], 200)
+    ax.plot(xs, kde(xs) * len(vals) * (edges[1] - edges[0]), color=color)
+
+
+# Cached builders for the figures app.py draws directly; the other charts
+# go through services.visualisation, whose plot helpers cache internally.
+# Figures are closed before returning so they don't pile up in pyplot's
+# registry; st.pyplot renders a closed figure without issue.
+@st.cache_resource
+def fig_distributions(df):
+    # constrained_layout spaces the grid during the single draw pass,
+    # avoiding tight_layout's extra Python-side layout sweep
+    fig, axes = plt.subplots(2, 2, figsize=(16, 10), constrained_layout=True)
+    panels = [('Average_rain_fall_mm_per_year', 'Average Rainfall Distribution', 'Rainfall (mm/year)', 'blue'),
+              ('Pesticides_tonnes', 'Pesticide Usage Distribution', 'Pesticides (tonnes)', 'green'),
+              ('Avg_temp', 'Average Temperature Distribution', 'Temperature (°C)', 'orange'),
+              ('Hg/ha_yield', 'Crop Yield Distribution', 'Yield (hg/ha)', 'purple')]
+    for ax, (col, title, xlabel, color) in zip(axes.flat, panels):
+        kde_hist(ax, df[col], color)
+        ax.set_title(title, fontsize=16)
+        ax.set_xlabel(xlabel, fontsize=15)
+        ax.set_ylabel('Frequency', fontsize=14)
+        ax.tick_params(axis='both', labelsize=12)
+    plt.close(fig)
+    return fig
+
+
+@st.cache_resource
+def fig_temp_by_crop(df):
+    fig, ax = plt.subplots(figsize=(12, 6))
+    sns.boxplot(data=df, x='Crop', y='Avg_temp', palette='coolwarm', hue='Crop')
+    ax.set_title('Temperature Distribution for Each Crop', fontsize=16)
+    ax.set_xlabel('Crop', fontsize=12)
+    ax.set_ylabel('Average Temperature (°C)', fontsize=12)
+    ax.tick_params(axis='x', labelrotation=45, labelsize=10)
+    ax.tick_params(axis='y', labelsize=11)
+    plt.close(fig)
+    return fig
+
+
+@st.cache_resource
+def fig_yearly_yield_by_crop(df):
+    fig, ax = plt.subplots(figsize=(14, 7))
+    sns.lineplot(data=df, x='Year', y='Hg/ha_yield', hue='Crop', estimator='mean', errorbar=None)
+    ax.set_title('Average Crop Yield per Year', fontsize=16)
+    ax.set_xlabel('Year', fontsize=15)
+    ax.set_ylabel('Yield (hg/ha)', fontsize=15)
+    ax.legend(title='Crop', bbox_to_anchor=(1.05, 1), loc='upper left')
+    ax.tick_params(axis='both', labelsize=13)
+    plt.close(fig)
+    return fig
+
+
 # Set up Streamlit layout to use full screen width
 st.set_page_config(layout="wide")
 
@@ -89,10 +199,10 @@ elif options == "Data Cleaning":
     if "df" in st.session_state and st.session_state.df is not None:
         # Load original dataset
         original_df = st.session_state.df
-        cleaned_df = original_df.copy()
 
-        # Perform cleaning
-        cleaning = Cleaning(cleaned_df)
+        # Perform cleaning — Cleaning copies internally before mutating,
+        # so no extra page-entry copy of the full frame is needed
+        cleaning = Cleaning(original_df)
         cleaning.handle_cleandata()
         cleaning.summary()
 
@@ -138,6 +248,14 @@ elif options == "Visualization":
         df = st.session_state.cleaned_df
         st.write(df.head())
 
+        # One grouped pass per key for every mean used below: slicing a
+        # column out of the combined result is free, while separate
+        # groupby calls would each re-hash the key column
+        year_stats = agg_mean(df, 'Year', ['Hg/ha_yield', 'Pesticides_tonnes',
+                                           'Avg_temp', 'Average_rain_fall_mm_per_year'])
+        area_means = agg_mean(df, 'Area', ['Hg/ha_yield', 'Average_rain_fall_mm_per_year',
+                                           'Avg_temp', 'Pesticides_tonnes'])
+
         if 'Crop' in df.columns:
             with st.expander("Crop Distribution"):
                 crops = df['Crop'].value_counts()
@@ -178,7 +296,7 @@ elif options == "Visualization":
             
             with col2:
                 # Group by Area and compute average yield
-                area_avg = df.groupby('Area')['Hg/ha_yield'].mean().reset_index()
+                area_avg = area_means['Hg/ha_yield'].reset_index()
                 area_avg.columns = ['Area', 'Hg/ha_yield']
                 title='Average Crop Yield by Area (hg/ha)'
                 # Plot using bar_plot function
@@ -219,28 +337,28 @@ elif options == "Visualization":
             col1, col2 = st.columns(2)
             with col1:
                 # Group data by 'Year' and calculate the mean of 'hg/ha_yield'
-                yearly_yield = df.groupby('Year')['Hg/ha_yield'].mean()
+                yearly_yield = year_stats['Hg/ha_yield']
                 title='Average Crop Yield per Year (hg/ha)'
                 ylabel= 'Average Yield (hg/ha)'
                 line_plot(yearly_yield, title= title, xlabel= 'Year', ylabel= ylabel, 
                         color= 'orange', marker= "o", figsize= (8, 5))
             
                 # Group data by 'Year' and calculate the mean of 'Pesticides_tonnes'
-                yearly_pesticide = df.groupby('Year')['Pesticides_tonnes'].mean()
+                yearly_pesticide = year_stats['Pesticides_tonnes']
                 title='Average Pesticide Use per Year (tonnes)'
                 ylabel= 'Average Pesticide Use (tonnes)'
                 line_plot(yearly_pesticide, title= title, xlabel= 'Year', ylabel= ylabel, 
                         color= 'green', marker= "o", figsize= (8, 5))
                 
             with col2:
-                avg_temp_year = df.groupby('Year')['Avg_temp'].mean()
+                avg_temp_year = year_stats['Avg_temp']
                 title= "Avg. Temperature Over Years"
-                line_plot(data= avg_temp_year, x=avg_temp_year.index, y=avg_temp_year.values, 
-                          title= title, xlabel= "Year", ylabel= "Temperature (°C)", figsize= (8, 5), color= 'blue')
+                line_plot(data= avg_temp_year, title= title, xlabel= "Year", 
+                          ylabel= "Temperature (°C)", figsize= (8, 5), color= 'blue')
             
-                avg_rain_year = df.groupby('Year')['Average_rain_fall_mm_per_year'].mean()
+                avg_rain_year = year_stats['Average_rain_fall_mm_per_year']
                 title= "Avg. Rainfall Over Years"
-                line_plot(data= avg_rain_year, x=avg_rain_year.index,title= title, 
+                line_plot(data= avg_rain_year, title= title, 
                           xlabel= "Year", ylabel= "Rainfall (mm)", figsize= (8, 5), color= 'purple')
 
 
@@ -259,7 +377,7 @@ elif options == "Visualization":
             with col1:
                 # Top 10 Areas by Rainfall
                 st.markdown("### Top 10 Countries by Average Rainfall")
-                top_rain = df.groupby('Area')['Average_rain_fall_mm_per_year'].mean().sort_values(ascending=False).head(10).reset_index()
+                top_rain = area_means['Average_rain_fall_mm_per_year'].sort_values(ascending=False).head(10).reset_index()
                 top_rain.columns = ['Area', 'Average_Rainfall']
                 title='Top 10 Countries by Average Rainfall (mm/year)'
                 bar_plot(df=top_rain,x='Average_Rainfall',y='Area',title=title,xlabel='Avg Rainfall (mm/year)',
@@ -267,7 +385,7 @@ elif options == "Visualization":
 
                 # Top 10 Hottest Countries (Average Temp)
                 st.markdown("### Top 10 Hottest Countries (Avg. Temperature)")
-                avg_temp = df.groupby('Area')['Avg_temp'].mean().sort_values(ascending=False).head(10).reset_index()
+                avg_temp = area_means['Avg_temp'].sort_values(ascending=False).head(10).reset_index()
                 avg_temp.columns = ['Area', 'Average_Temperature']
                 title='Top 10 Countries by Average Temperature'
                 bar_plot(df=avg_temp,x='Average_Temperature',y='Area',title=title,xlabel='Average Temperature (°C)',
@@ -276,7 +394,7 @@ elif options == "Visualization":
             # Column 2: Pesticide Usage
             with col2:
                 st.markdown("### Top 10 Countries by Pesticide Use")
-                top_pesticide = df.groupby('Area')['Pesticides_tonnes'].sum().sort_values(ascending=False).head(10).reset_index()
+                top_pesticide = agg_sum(df, 'Area', 'Pesticides_tonnes').sort_values(ascending=False).head(10).reset_index()
                 top_pesticide.columns = ['Area', 'Pesticides_Used']
                 title="Top 10 Countries by Pesticide Use"
                 xlabel="Total Pesticides Used (tonnes)"
@@ -302,7 +420,7 @@ elif options == "Visualization":
                     if i + j < len(metric_items):
                         with cols[j]:
                             col_name, (label, color) = metric_items[i + j]
-                            df_metric = df_crop.groupby('Year')[col_name].mean()
+                            df_metric = agg_mean(df_crop, 'Year', col_name)
                             title = f"{label} over Years for {selected_crop}"
                             line_plot(data=df_metric,title=title,xlabel="Year",
                                       ylabel=label,color=color,figsize=(8, 5))
@@ -314,7 +432,11 @@ elif options == "Visualization":
             # Column 1: Maximum Yield per Crop by Area
             with col1:
                 st.markdown("### Maximum Yield per Crop by Area")
-                best_crop = df.loc[df.groupby('Crop')['Hg/ha_yield'].idxmax()][['Crop', 'Area', 'Hg/ha_yield']]
+                # Project the three needed columns, sort once by yield and
+                # keep each crop's first row instead of idxmax + full gather
+                best_crop = (df[['Crop', 'Area', 'Hg/ha_yield']]
+                             .sort_values('Hg/ha_yield', ascending=False, kind='stable')
+                             .drop_duplicates('Crop', keep='first'))
                 title='Maximum Yield per Crop by Area (hg/ha)'
                 ylabel='Maximum Yield (hg/ha)'
                 bar_plot(df=best_crop,x='Area',y='Hg/ha_yield',title=title,xlabel='Area',ylabel=ylabel,
@@ -324,7 +446,7 @@ elif options == "Visualization":
             # Column 2: Total Yield by Crop
             with col2:
                 st.markdown("### Total Yield by Crop Type")
-                yield_per_crop = df.groupby('Crop')['Hg/ha_yield'].sum().reset_index()
+                yield_per_crop = agg_sum(df, 'Crop', 'Hg/ha_yield').reset_index()
                 yield_per_crop.columns = ['Crop', 'Total_Yield']
                 title='Total Crop Yield (hg/ha)'
                 ylabel='Total Yield (hg/ha)'
@@ -334,7 +456,7 @@ elif options == "Visualization":
         # Crops With Most Pesticide Used
         with st.expander("Crops With Most Pesticide Used"):
             # Group by Crop and sum pesticide usage
-            crop_pesticide = df.groupby('Crop')['Pesticides_tonnes'].sum().sort_values(ascending=False).head(10).reset_index()
+            crop_pesticide = agg_sum(df, 'Crop', 'Pesticides_tonnes').sort_values(ascending=False).head(10).reset_index()
             crop_pesticide.columns = ['Crop', 'Pesticides_Used']
             title="Top 10 Crops by Pesticide Usage"
             # Plot using the reusable bar_plot function
@@ -348,21 +470,21 @@ elif options == "Visualization":
             with col1:
                 title='Pesticide vs Crop Yield'
                 xlabel='Pesticides (tonnes)'
-                scatter_plot(df=df,x='Pesticides_tonnes',y='Hg/ha_yield',title=title,xlabel=xlabel,
-                             ylabel='Yield (hg/ha)',hue='Crop',alpha=0.7)
+                scatter_gl_plot(df=scatter_sample(df, 'Crop'),x='Pesticides_tonnes',y='Hg/ha_yield',title=title,xlabel=xlabel,
+                                ylabel='Yield (hg/ha)',hue='Crop',alpha=0.7)
 
-                scatter_plot(df=df,x='Avg_temp',y='Hg/ha_yield',title='Temperature vs Crop Yield',
-                             xlabel='Temperature (°C)',ylabel='Yield (hg/ha)',hue='Crop')
+                scatter_gl_plot(df=scatter_sample(df, 'Crop'),x='Avg_temp',y='Hg/ha_yield',title='Temperature vs Crop Yield',
+                                xlabel='Temperature (°C)',ylabel='Yield (hg/ha)',hue='Crop')
 
             with col2:
                 # Rainfall vs Yield
-                scatter_plot(df=df,x='Average_rain_fall_mm_per_year',y='Hg/ha_yield',title='Effect of Rainfall on Crop Yield',
-                             xlabel='Average Rainfall (mm/year)',ylabel='Yield (hg/ha)',hue='Crop',alpha=0.6)
+                scatter_gl_plot(df=scatter_sample(df, 'Crop'),x='Average_rain_fall_mm_per_year',y='Hg/ha_yield',title='Effect of Rainfall on Crop Yield',
+                                xlabel='Average Rainfall (mm/year)',ylabel='Yield (hg/ha)',hue='Crop',alpha=0.6)
 
 
         # Country-Level Resource Usage
         with st.expander("Country-level Averages (Pesticide vs Yield)"):
-            avg_data_country = df.groupby('Area')[['Pesticides_tonnes', 'Hg/ha_yield']].mean().dropna().reset_index()
+            avg_data_country = area_means[['Pesticides_tonnes', 'Hg/ha_yield']].dropna().reset_index()
             title='Avg Pesticide Use vs Crop Yield by Country'
             scatter_plot(df=avg_data_country,x='Pesticides_tonnes',y='Hg/ha_yield',title=title,
                          xlabel='Avg Pesticide Use (tonnes)',ylabel='Avg Yield (hg/ha)')
@@ -373,68 +495,19 @@ elif options == "Visualization":
             title='Rainfall vs Pesticide Use by Crop'
             xlabel='Average Rainfall (mm/year)'
             x='Average_rain_fall_mm_per_year'
-            scatter_plot(df=df,x=x,y='Pesticides_tonnes',title=title,
-                         xlabel=xlabel,ylabel='Pesticide Use (tonnes)',hue='Crop',alpha=0.7)
+            scatter_gl_plot(df=scatter_sample(df, 'Crop'),x=x,y='Pesticides_tonnes',title=title,
+                            xlabel=xlabel,ylabel='Pesticide Use (tonnes)',hue='Crop',alpha=0.7)
 
         with st.expander("Distributions: Rainfall, Pesticides, Temperature, and Yield"):
-            fig, axes = plt.subplots(2, 2, figsize=(16, 10))
-            # Rainfall
-            sns.histplot(df['Average_rain_fall_mm_per_year'], kde=True, ax=axes[0, 0], color='blue')
-            axes[0, 0].set_title('Average Rainfall Distribution', fontsize=16)
-            axes[0, 0].set_xlabel('Rainfall (mm/year)', fontsize=15)
-            axes[0, 0].set_ylabel('Frequency', fontsize=14)
-            # Pesticides
-            sns.histplot(df['Pesticides_tonnes'], kde=True, ax=axes[0, 1], color='green')
-            axes[0, 1].set_title('Pesticide Usage Distribution', fontsize=16)
-            axes[0, 1].set_xlabel('Pesticides (tonnes)', fontsize=15)
-            axes[0, 1].set_ylabel('Frequency', fontsize=14)
-            # Temperature
-            sns.histplot(df['Avg_temp'], kde=True, ax=axes[1, 0], color='orange')
-            axes[1, 0].set_title('Average Temperature Distribution', fontsize=16)
-            axes[1, 0].set_xlabel('Temperature (°C)', fontsize=15)
-            axes[1, 0].set_ylabel('Frequency', fontsize=14)
-            # Yield
-            sns.histplot(df['Hg/ha_yield'], kde=True, ax=axes[1, 1], color='purple')
-            axes[1, 1].set_title('Crop Yield Distribution', fontsize=16)
-            axes[1, 1].set_xlabel('Yield (hg/ha)', fontsize=15)
-            axes[1, 1].set_ylabel('Frequency', fontsize=14)
-            # Update tick label fonts for all subplots
-            for ax in axes.flat:
-                for label in ax.get_xticklabels():
-                    label.set_fontsize(12)
-                    # label.set_rotation(30)
-                for label in ax.get_yticklabels():
-                    label.set_fontsize(12)
-            plt.tight_layout()
-            st.pyplot(fig)
+            st.pyplot(fig_distributions(df))
 
         # Boxplot: Temperature Needed by Various Crops
         with st.expander("Temperature Distribution by Crop"):
-            fig, ax = plt.subplots(figsize=(12, 6))
-            sns.boxplot(data=df, x='Crop', y='Avg_temp', palette='coolwarm', hue='Crop')
-            ax.set_title('Temperature Distribution for Each Crop', fontsize=16)
-            ax.set_xlabel('Crop', fontsize=12)
-            ax.set_ylabel('Average Temperature (°C)', fontsize=12)
-            for label in ax.get_xticklabels():
-                label.set_rotation(45)
-                label.set_fontsize(10)
-            for label in ax.get_yticklabels():
-                label.set_fontsize(11)
-            st.pyplot(fig)
+            st.pyplot(fig_temp_by_crop(df))
         
         # Average Yield per Year by Crop
         with st.expander("Average Crop Yield per Year"):
-            fig, ax = plt.subplots(figsize=(14, 7))
-            sns.lineplot(data=df, x='Year', y='Hg/ha_yield', hue='Crop', estimator='mean', errorbar=None)
-            ax.set_title('Average Crop Yield per Year', fontsize=16)
-            ax.set_xlabel('Year', fontsize=15)
-            ax.set_ylabel('Yield (hg/ha)', fontsize=15)
-            ax.legend(title='Crop', bbox_to_anchor=(1.05, 1), loc='upper left')
-            for label in ax.get_xticklabels():
-                label.set_fontsize(13)
-            for label in ax.get_yticklabels():
-                label.set_fontsize(13)
-            st.pyplot(fig)
+            st.pyplot(fig_yearly_yield_by_crop(df))
     else:
         # Message shown if user tries to access this step before uploading data
         st.warning("Please upload a dataset first in the 'Upload Data' section.")
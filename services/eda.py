@@ -32,15 +32,20 @@ class EDA:
         st.subheader("Missing Values")
         # Define common missing value representations not detected by default (e.g., 'NA', '-', '', etc.)
         missing_values = ['NA', 'na', 'n/a', 'N/a', '', 'null', '-']
-        # Replace all custom missing value indicators with np.nan
-        for column in self.df.columns:
-            self.df[column] = self.df[column].replace(missing_values, np.nan)
+        # Replace all custom missing value indicators with np.nan in a
+        # single vectorized pass instead of one replace call per column;
+        # in place so the session-state frame later steps clean sees the
+        # converted values too
+        self.df.replace(missing_values, np.nan, inplace=True)
         # Create a summary DataFrame of missing values
         missing_df = pd.DataFrame(self.df.isna().sum(), columns=['Missing Values'])
         missing_df["Percentage (%)"] = (missing_df['Missing Values'] / len(self.df)) * 100
         missing_df = missing_df[missing_df['Missing Values'] > 0]  # Show only columns with missing data
         # Display the missing values summary table in the Streamlit app
-        st.dataframe(missing_df.style.format({"Percentage (%)": "{:.2f}"}))
+        # Preformat the percentage as a plain string column: Styler builds
+        # HTML per cell on every rerun, which is the slow path for wide frames
+        missing_df['Percentage (%)'] = missing_df['Percentage (%)'].map('{:.2f}'.format)
+        st.dataframe(missing_df)
 
     def duplicates(self):
         # Count and show number of duplicate rows
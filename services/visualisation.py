@@ -4,9 +4,32 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
+import plotly.express as px
 from typing import Optional, Tuple, List, Union
 
 
+# Each public *_plot function below delegates figure construction to a
+# cached builder: building the seaborn/matplotlib figure dominates rerun
+# time, and Streamlit reruns the whole script on every widget interaction,
+# so each Figure is drawn once per distinct inputs and replayed from the
+# resource cache afterwards. Builders close the figure before returning so
+# it does not pile up in pyplot's registry; st.pyplot renders a closed
+# figure without issue.
+
+
+@st.cache_resource
+def _pie_fig(values, labels, title, figsize):
+    # Create figure and axis if not provided
+    fig, ax = plt.subplots(figsize=figsize)
+    # Slightly explode all slices for emphasis
+    explode = [0.05] * len(values)
+    # Draw the pie chart
+    ax.pie(values,labels=labels,autopct='%1.1f%%',startangle=140,explode=explode,textprops={'fontsize': 14})
+    # Set title
+    ax.set_title(title, fontsize=16)
+    plt.close(fig)  # Close the figure to free memory
+    return fig
+
 
 def pie_plot(values: Union[List[float], List[int]],labels: List[str],title: str = "Pie Chart",figsize: Tuple[int, int] = (6, 6)):
     """
@@ -18,17 +41,30 @@ def pie_plot(values: Union[List[float], List[int]],labels: List[str],title: str
     - ax: Optional matplotlib axis to plot on. If None, a new figure is created.
     - figsize: Tuple indicating figure size (default is (6, 6)).
     """
-    # Create figure and axis if not provided
+    # Render the cached figure in Streamlit
+    st.pyplot(_pie_fig(tuple(values), tuple(labels), title, figsize))
+
+
+@st.cache_resource
+def _bar_fig(df, x, y, title, xlabel, ylabel, hue, palette, figsize,
+             rotation_x, rotation_y, legend_title, legend_loc, legend_bbox):
+    # Create the plot
     fig, ax = plt.subplots(figsize=figsize)
-    # Slightly explode all slices for emphasis
-    explode = [0.05] * len(values)
-    # Draw the pie chart
-    ax.pie(values,labels=labels,autopct='%1.1f%%',startangle=140,explode=explode,textprops={'fontsize': 14})
-    # Set title
+    sns.barplot(data=df,x=x,y=y,hue=hue,palette=palette,ax=ax)
+    # Style axis ticks in one call per axis instead of per-label loops
+    ax.tick_params(axis='x', labelrotation=rotation_x, labelsize=11)
+    ax.tick_params(axis='y', labelrotation=rotation_y, labelsize=11)
+    # Legend handling
+    if hue and legend_title:
+        ax.legend(title=legend_title, title_fontsize=12, fontsize=10, loc=legend_loc, bbox_to_anchor=legend_bbox)
+    # Set labels and title
+    ax.set_xlabel(xlabel, fontsize=14)
+    ax.set_ylabel(ylabel, fontsize=14)
     ax.set_title(title, fontsize=16)
-    # Render in Streamlit
-    st.pyplot(fig)
-    plt.close(fig)  # Close the figure to free memory
+    # Adjust layout
+    plt.tight_layout()
+    plt.close(fig)
+    return fig
 
 
 def bar_plot(df,x: str,y: str,title: str = "Bar Plot",xlabel: Optional[str] = None,ylabel: Optional[str] = None,
@@ -52,28 +88,27 @@ def bar_plot(df,x: str,y: str,title: str = "Bar Plot",xlabel: Optional[str] = No
     # Set default labels if not provided
     xlabel = xlabel or x
     ylabel = ylabel or y
-    # Create the plot
+    st.pyplot(_bar_fig(df, x, y, title, xlabel, ylabel, hue, palette, figsize,
+                       rotation_x, rotation_y, legend_title, legend_loc, legend_bbox))
+
+
+@st.cache_resource
+def _count_fig(df, column, xlabel, ylabel, title, palette, figsize, rotation_x, rotation_y):
     fig, ax = plt.subplots(figsize=figsize)
-    sns.barplot(data=df,x=x,y=y,hue=hue,palette=palette,ax=ax)
-    # Style axis ticks
-    for tick in ax.get_xticklabels():
-        tick.set_rotation(rotation_x)
-        tick.set_fontsize(11)
-    for tick in ax.get_yticklabels():
-        tick.set_rotation(rotation_y)
-        tick.set_fontsize(11)
-    # Legend handling
-    if hue and legend_title:
-        ax.legend(title=legend_title, title_fontsize=12, fontsize=10, loc=legend_loc, bbox_to_anchor=legend_bbox)
+    sns.countplot(data=df, y=column, palette=palette, ax=ax)
+    # Axis styling
+    ax.tick_params(axis='x', labelrotation=rotation_x, labelsize=12)
+    ax.tick_params(axis='y', labelrotation=rotation_y, labelsize=10)
     # Set labels and title
-    ax.set_xlabel(xlabel, fontsize=14)
-    ax.set_ylabel(ylabel, fontsize=14)
-    ax.set_title(title, fontsize=16)
-    # Adjust layout and show in Streamlit
+    ax.set_xlabel(xlabel, fontsize=12)
+    ax.set_ylabel(ylabel, fontsize=12)
+    ax.set_title(title, fontsize=14)
     plt.tight_layout()
-    st.pyplot(fig)
+    plt.close(fig)
+    return fig
 
-def count_plot(df: pd.DataFrame, column: str = 'Area', xlabel: Optional[str] = None, ylabel: Optional[str] = None, 
+
+def count_plot(df: pd.DataFrame, column: str = 'Area', xlabel: Optional[str] = None, ylabel: Optional[str] = None,
                title: str = "Count Plot", palette: str = 'viridis', figsize: Tuple[int, int] = (10, 6), rotation_x: int = 0,
                rotation_y: int = 0):
     """
@@ -92,23 +127,37 @@ def count_plot(df: pd.DataFrame, column: str = 'Area', xlabel: Optional[str] = N
     # Validate input column
     xlabel = xlabel or "Frequency"
     ylabel = ylabel or column
+    st.pyplot(_count_fig(df, column, xlabel, ylabel, title, palette, figsize, rotation_x, rotation_y))
+
 
+# Line and scatter builders can be keyed by selection-dependent data
+# (e.g. the per-country trend frame), so their caches are capped to keep
+# a browsing session from pinning one Figure per selectbox choice
+@st.cache_resource(max_entries=64)
+def _line_fig(data, x, y, hue, title, xlabel, ylabel, color, marker, linewidth, figsize, grid):
     fig, ax = plt.subplots(figsize=figsize)
-    sns.countplot(data=df, y=column, palette=palette, ax=ax)
-    # Axis styling
-    for tick in ax.get_xticklabels():
-        tick.set_rotation(rotation_x)
-        tick.set_fontsize(12)
-    for tick in ax.get_yticklabels():
-        tick.set_rotation(rotation_y)
-        tick.set_fontsize(10)
-    # Set labels and title
-    ax.set_xlabel(xlabel, fontsize=12)
-    ax.set_ylabel(ylabel, fontsize=12)
-    ax.set_title(title, fontsize=14)
+    # Plotting logic
+    if isinstance(data, Series):
+        data.plot(ax=ax, color=color, linewidth=linewidth, marker=marker)
+        if xlabel is None: xlabel = data.index.name or "Index"
+        if ylabel is None: ylabel = "Value"
+    else:
+        sns.lineplot(data=data, x=x, y=y, hue=hue, marker=marker, linewidth=linewidth,
+                     ax=ax, palette="tab10" if hue else None, color=None if hue else color)
+        if xlabel is None: xlabel = x
+        if ylabel is None: ylabel = y
+    # Styling
+    ax.set_title(title, fontsize=17)
+    ax.set_xlabel(xlabel, fontsize=15)
+    ax.set_ylabel(ylabel, fontsize=15)
+    ax.tick_params(axis='x', labelsize=14)
+    ax.tick_params(axis='y', labelsize=14)
+    if grid:
+        ax.grid(True, linestyle='--', alpha=0.6)
     plt.tight_layout()
-    st.pyplot(fig)
     plt.close(fig)
+    return fig
+
 
 def line_plot(data: Union[Series, DataFrame], x: Optional[str] = None, y: Optional[str] = None, hue: Optional[str] = None,
               title: str = "Line Plot", xlabel: Optional[str] = None, ylabel: Optional[str] = None, color: str = "orange",
@@ -126,28 +175,22 @@ def line_plot(data: Union[Series, DataFrame], x: Optional[str] = None, y: Option
     - figsize: Size of figure
     - grid: Show gridlines
     """
+    st.pyplot(_line_fig(data, x, y, hue, title, xlabel, ylabel, color, marker, linewidth, figsize, grid))
+
+
+@st.cache_resource(max_entries=64)
+def _scatter_fig(df, x, y, title, xlabel, ylabel, hue, alpha, figsize, legend_title, legend_loc, legend_bbox):
     fig, ax = plt.subplots(figsize=figsize)
-    # Plotting logic
-    if isinstance(data, Series):
-        data.plot(ax=ax, color=color, linewidth=linewidth, marker=marker)
-        if xlabel is None: xlabel = data.index.name or "Index"
-        if ylabel is None: ylabel = "Value"
-    else:
-        sns.lineplot(data=data, x=x, y=y, hue=hue, marker=marker, linewidth=linewidth,
-                     ax=ax, palette="tab10" if hue else None, color=None if hue else color)
-        if xlabel is None: xlabel = x
-        if ylabel is None: ylabel = y
-    # Styling
-    ax.set_title(title, fontsize=17)
+    sns.scatterplot(data=df, x=x, y=y, hue=hue, alpha=alpha, ax=ax)
+    ax.set_title(title, fontsize=16)
     ax.set_xlabel(xlabel, fontsize=15)
     ax.set_ylabel(ylabel, fontsize=15)
-    ax.tick_params(axis='x', labelsize=14)
-    ax.tick_params(axis='y', labelsize=14)
-    if grid:
-        ax.grid(True, linestyle='--', alpha=0.6)
-    plt.tight_layout()
-    st.pyplot(fig)
+    ax.tick_params(axis='both', labelsize=13)
+    if hue:
+        ax.legend(title=legend_title or hue, bbox_to_anchor=legend_bbox, loc=legend_loc, fontsize=12, title_fontsize=12)
     plt.close(fig)
+    return fig
+
 
 def scatter_plot(df, x: str, y: str, title: str = "Scatter Plot",
                 xlabel: Optional[str] = None, ylabel: Optional[str] = None,
@@ -171,16 +214,35 @@ def scatter_plot(df, x: str, y: str, title: str = "Scatter Plot",
     """
     xlabel = xlabel or x
     ylabel = ylabel or y
+    st.pyplot(_scatter_fig(df, x, y, title, xlabel, ylabel, hue, alpha, figsize,
+                           legend_title, legend_loc, legend_bbox))
 
-    fig, ax = plt.subplots(figsize=figsize)
-    sns.scatterplot(data=df, x=x, y=y, hue=hue, alpha=alpha, ax=ax)
-    ax.set_title(title, fontsize=16)
-    ax.set_xlabel(xlabel, fontsize=15)
-    ax.set_ylabel(ylabel, fontsize=15)
-    for label in ax.get_xticklabels():
-        label.set_fontsize(13)
-    for label in ax.get_yticklabels():
-        label.set_fontsize(13)
-    if hue:
-        ax.legend(title=legend_title or hue, bbox_to_anchor=legend_bbox, loc=legend_loc, fontsize=12, title_fontsize=12)
-    st.pyplot(fig)
+
+@st.cache_resource
+def _scatter_gl_fig(df, x, y, title, xlabel, ylabel, hue, alpha):
+    fig = px.scatter(df, x=x, y=y, color=hue, opacity=alpha, title=title,
+                     labels={x: xlabel, y: ylabel}, render_mode='webgl')
+    return fig
+
+
+def scatter_gl_plot(df, x: str, y: str, title: str = "Scatter Plot",
+                    xlabel: Optional[str] = None, ylabel: Optional[str] = None,
+                    hue: Optional[str] = None, alpha: float = 0.6):
+    """
+    Scatter plot on Plotly's WebGL renderer for large point clouds.
+    Matplotlib pushes every marker through its SVG path machinery, which
+    bogs down past a few thousand points; scattergl draws them on the GPU
+    in the browser and stays smooth well past 100k points.
+    Parameters:
+    - df: Pandas DataFrame
+    - x: Column for x-axis
+    - y: Column for y-axis
+    - title: Title of the plot
+    - xlabel, ylabel: Axis labels
+    - hue: Column name for color grouping
+    - alpha: Transparency of dots
+    """
+    xlabel = xlabel or x
+    ylabel = ylabel or y
+    st.plotly_chart(_scatter_gl_fig(df, x, y, title, xlabel, ylabel, hue, alpha),
+                    use_container_width=True)